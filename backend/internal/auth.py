@@ -8,21 +8,11 @@ from starlette.middleware.sessions import SessionMiddleware
 import secrets
 import hashlib
 from typing import Optional
-import aiosqlite
-from pathlib import Path
-
-# Database path
-BASE_DIR = Path(__file__).parent.parent.parent
-DB_PATH = BASE_DIR / "data" / "parameters.db"
+from .database import get_reader
 
 security = HTTPBasic()
 
 
-async def get_db():
-    """Get database connection"""
-    return await aiosqlite.connect(str(DB_PATH))
-
-
 def get_current_user(request: Request) -> Optional[str]:
     """Get current user from session"""
     return request.session.get("username")
@@ -34,13 +24,10 @@ async def get_current_user_role(request: Request) -> Optional[str]:
     if not username:
         return None
     
-    db = await get_db()
-    try:
+    async with get_reader() as db:
         cursor = await db.execute("SELECT role FROM users WHERE username = ?", (username,))
         row = await cursor.fetchone()
         return row[0] if row else None
-    finally:
-        await db.close()
 
 
 async def get_current_user_subteam(request: Request) -> Optional[str]:
@@ -49,13 +36,10 @@ async def get_current_user_subteam(request: Request) -> Optional[str]:
     if not username:
         return None
     
-    db = await get_db()
-    try:
+    async with get_reader() as db:
         cursor = await db.execute("SELECT subteam FROM users WHERE username = ?", (username,))
         row = await cursor.fetchone()
         return row[0] if row else None
-    finally:
-        await db.close()
 
 
 def require_auth(request: Request) -> str:
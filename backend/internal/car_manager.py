@@ -6,10 +6,15 @@ import re
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import aiosqlite
-from .database import get_db
+from .database import get_reader, get_writer
 from .config.settings import settings
 
+# Filename/device patterns, compiled once at import (configured car patterns come from settings)
+CAR_ID_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in settings.CAR_ID_PATTERNS]
+TEAM_ID_REGEX = re.compile(r'([A-Z]+)[_\s-]?(\d{4})[_\s-]?(car|vehicle|chassis)?[_\s-]?(\d+)?', re.IGNORECASE)
+DEVICE_CAR_REGEX = re.compile(r'car[_\s-]?(\d+)')
+SIMPLE_CAR_REGEX = re.compile(r'\b[Cc](\d+)\b')
+
 
 async def get_or_create_car(car_identifier: str, display_name: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -22,10 +27,7 @@ async def get_or_create_car(car_identifier: str, display_name: Optional[str] = N
     Returns:
         Car dictionary with id, car_identifier, display_name, etc.
     """
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        
+    async with get_writer() as db:
         # Check if car exists
         cursor = await db.execute(
             "SELECT * FROM cars WHERE car_identifier = ?",
@@ -61,37 +63,27 @@ async def get_or_create_car(car_identifier: str, display_name: Optional[str] = N
             )
             row = await cursor.fetchone()
             return dict(row) if row else None
-    finally:
-        await db.close()
 
 
 async def get_all_cars() -> List[Dict[str, Any]]:
     """Get all registered cars"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
+    async with get_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM cars ORDER BY last_seen_at DESC, car_identifier ASC"
         )
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
-    finally:
-        await db.close()
 
 
 async def get_car_by_identifier(car_identifier: str) -> Optional[Dict[str, Any]]:
     """Get car by identifier"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
+    async with get_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM cars WHERE car_identifier = ?",
             (car_identifier,)
         )
         row = await cursor.fetchone()
         return dict(row) if row else None
-    finally:
-        await db.close()
 
 
 def extract_car_identifier_from_motec_file(
@@ -137,17 +129,14 @@ def extract_car_identifier_from_motec_file(
     filename_lower = filename.lower()
     
     # Pattern: Car1_Session.ldx, Car-2_Session.ldx, etc. (from config)
-    car_patterns = settings.CAR_ID_PATTERNS
-    
-    for pattern in car_patterns:
-        match = re.search(pattern, filename_lower, re.IGNORECASE)
+    for pattern in CAR_ID_REGEXES:
+        match = pattern.search(filename_lower)
         if match:
             car_num = match.group(1) if match.lastindex else match.group(0)
             return f"Car{car_num}"
     
     # Pattern: FSAE-2024-01, USC-2024-Car1, etc.
-    team_pattern = r'([A-Z]+)[_\s-]?(\d{4})[_\s-]?(car|vehicle|chassis)?[_\s-]?(\d+)?'
-    match = re.search(team_pattern, filename, re.IGNORECASE)
+    match = TEAM_ID_REGEX.search(filename)
     if match:
         team = match.group(1)
         year = match.group(2)
@@ -160,14 +149,13 @@ def extract_car_identifier_from_motec_file(
         device_name = parsed_data.get("device_name", "")
         if device_name:
             # Sometimes device name contains car info
-            car_match = re.search(r'car[_\s-]?(\d+)', device_name.lower())
+            car_match = DEVICE_CAR_REGEX.search(device_name.lower())
             if car_match:
                 return f"Car{car_match.group(1)}"
     
     # Method 4: Check if filename contains any car-like identifier
     # Look for patterns like "C1", "C2", etc.
-    simple_pattern = r'\b[Cc](\d+)\b'
-    match = re.search(simple_pattern, filename)
+    match = SIMPLE_CAR_REGEX.search(filename)
     if match:
         return f"Car{match.group(1)}"
     
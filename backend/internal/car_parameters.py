@@ -2,8 +2,10 @@
 Car Parameters Management - Define and manage car parameters like tire pressure
 Similar to registered_users.py pattern - stores parameter definitions
 """
-import json
+import orjson
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -11,7 +13,12 @@ from typing import List, Dict, Any, Optional
 BASE_DIR = Path(__file__).parent.parent.parent
 CAR_PARAMETERS_FILE = BASE_DIR / "data" / "car_parameters.json"
 
+# Parsed definitions + lookup indexes, reused until the file's (mtime, size, inode) changes.
+# Read-only: mutators go through load_car_parameters() and save_car_parameters().
+_definitions_cache: Dict[str, Any] = {"key": None, "params": [], "by_name": {}, "by_link_key": {}}
 
+
+@lru_cache(maxsize=1024)
 def generate_link_key(subteam: str, tab: str, variable_name: str) -> str:
     """
     Generate composite link key: subteam_tab_variablename
@@ -107,43 +114,69 @@ def ensure_car_parameters_file():
                 }
             ]
         }
-        with open(CAR_PARAMETERS_FILE, 'w') as f:
-            json.dump(default_params, f, indent=2, default=str)
+        CAR_PARAMETERS_FILE.write_bytes(orjson.dumps(default_params, option=orjson.OPT_INDENT_2))
 
 
 def load_car_parameters() -> Dict[str, Any]:
     """Load car parameters definitions from JSON file"""
     ensure_car_parameters_file()
     try:
-        with open(CAR_PARAMETERS_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
+        return orjson.loads(CAR_PARAMETERS_FILE.read_bytes())
+    except (orjson.JSONDecodeError, FileNotFoundError):
         return {"parameters": []}
 
 
 def save_car_parameters(data: Dict[str, Any]):
     """Save car parameters definitions to JSON file"""
     ensure_car_parameters_file()
-    with open(CAR_PARAMETERS_FILE, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+    # Atomic write: a crash mid-save must not leave a truncated definitions file
+    temp_path = CAR_PARAMETERS_FILE.with_suffix(CAR_PARAMETERS_FILE.suffix + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, CAR_PARAMETERS_FILE)
+    _definitions_cache["key"] = None
+
+
+def _cached_definitions() -> Dict[str, Any]:
+    """Get parsed definitions and indexes, re-reading the file only when it has changed"""
+    try:
+        stat = CAR_PARAMETERS_FILE.stat()
+    except FileNotFoundError:
+        ensure_car_parameters_file()
+        stat = CAR_PARAMETERS_FILE.stat()
+    
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    if _definitions_cache["key"] != key:
+        params = load_car_parameters().get("parameters", [])
+        by_name = {}
+        by_link_key = {}
+        for p in params:
+            # First match wins, like the previous linear scans
+            by_name.setdefault(p.get("parameter_name"), p)
+            if p.get("link_key"):
+                by_link_key.setdefault(p["link_key"], p)
+        _definitions_cache.update(key=key, params=params, by_name=by_name, by_link_key=by_link_key)
+    
+    return _definitions_cache
 
 
 def get_all_car_parameter_definitions() -> List[Dict[str, Any]]:
     """Get all car parameter definitions"""
-    data = load_car_parameters()
-    return data.get("parameters", [])
+    return list(_cached_definitions()["params"])
 
 
 def get_car_parameter_definition(parameter_name: str) -> Optional[Dict[str, Any]]:
     """Get definition for a specific car parameter by parameter_name"""
-    params = get_all_car_parameter_definitions()
-    return next((p for p in params if p.get("parameter_name") == parameter_name), None)
+    return _cached_definitions()["by_name"].get(parameter_name)
 
 
 def get_car_parameter_definition_by_link_key(link_key: str) -> Optional[Dict[str, Any]]:
     """Get definition for a specific car parameter by link_key"""
-    params = get_all_car_parameter_definitions()
-    return next((p for p in params if p.get("link_key") == link_key), None)
+    if not link_key:
+        return None
+    return _cached_definitions()["by_link_key"].get(link_key)
 
 
 def add_car_parameter_definition(
@@ -184,6 +217,70 @@ def add_car_parameter_definition(
     data = load_car_parameters()
     params = data.get("parameters", [])
     
+    _upsert_car_parameter_definition(
+        params,
+        parameter_name=parameter_name,
+        display_name=display_name,
+        subteam=subteam,
+        unit=unit,
+        default_value=default_value,
+        min_value=min_value,
+        max_value=max_value,
+        motec_channel=motec_channel,
+        description=description,
+        link_key=link_key,
+        tab=tab,
+        inject_type=inject_type,
+        variable_name=variable_name,
+        param_type=param_type
+    )
+    
+    data["parameters"] = params
+    save_car_parameters(data)
+    return True
+
+
+def add_car_parameter_definitions(definitions: List[Dict[str, Any]]) -> int:
+    """
+    Add or update many car parameter definitions with a single load and save.
+    Each entry takes the same keyword arguments as add_car_parameter_definition.
+    
+    Returns:
+        Number of definitions written
+    """
+    if not definitions:
+        return 0
+    
+    data = load_car_parameters()
+    params = data.get("parameters", [])
+    
+    for definition in definitions:
+        _upsert_car_parameter_definition(params, **definition)
+    
+    data["parameters"] = params
+    save_car_parameters(data)
+    return len(definitions)
+
+
+def _upsert_car_parameter_definition(
+    params: List[Dict[str, Any]],
+    parameter_name: str,
+    display_name: str,
+    subteam: str,
+    unit: str,
+    default_value: str,
+    min_value: Optional[str] = None,
+    max_value: Optional[str] = None,
+    motec_channel: Optional[str] = None,
+    description: Optional[str] = None,
+    link_key: Optional[str] = None,
+    tab: Optional[str] = None,
+    inject_type: Optional[str] = None,
+    variable_name: Optional[str] = None,
+    param_type: Optional[str] = None
+):
+    """Add or update a definition in an already-loaded parameter list (no save)"""
+    
     # Generate link_key if not provided but we have the necessary fields
     if not link_key and subteam and variable_name:
         link_key = generate_link_key(subteam, tab or "", variable_name)
@@ -230,10 +327,6 @@ def add_car_parameter_definition(
         params[existing_index] = existing_param
     else:
         params.append(param_def)
-    
-    data["parameters"] = params
-    save_car_parameters(data)
-    return True
 
 
 def remove_car_parameter_definition(parameter_name: str) -> bool:
@@ -64,6 +64,8 @@ class Settings:
     MOTEC_LDX_EXTENSION: str = os.getenv("MOTEC_LDX_EXTENSION", ".ldx")
     MOTEC_LD_EXTENSION: str = os.getenv("MOTEC_LD_EXTENSION", ".ld")
     MOTEC_LD_HEADER_SIZE: int = int(os.getenv("MOTEC_LD_HEADER_SIZE", "2048"))
+    # Verbose LDX update logging (BEFORE/AFTER file hashes and a read-back check of every write)
+    MOTEC_LDX_UPDATER_DEBUG: bool = os.getenv("MOTEC_LDX_UPDATER_DEBUG", "false").lower() == "true"
     
     # Car Identification Patterns (comma-separated regex patterns)
     CAR_ID_PATTERNS: List[str] = os.getenv(
@@ -4,17 +4,31 @@ Parses CSV with columns: Subteam, Tab, Variable Name, Type, Inject, Unit
 """
 import csv
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from io import StringIO
 
 from .car_parameters import (
     generate_link_key, 
-    add_car_parameter_definition,
-    get_car_parameter_definition_by_link_key
+    add_car_parameter_definitions,
+    get_all_car_parameter_definitions
 )
 
+# Patterns used on every CSV row, compiled once at import
+RANGE_REGEX = re.compile(r'(-?\d+(?:\.\d+)?)\s+to\s+(-?\d+(?:\.\d+)?)', re.IGNORECASE)
+EXPECTED_RANGE_REGEX = re.compile(r'expected value of\s+-?\d+(?:\.\d+)?\s+to\s+-?\d+(?:\.\d+)?', re.IGNORECASE)
+BARE_RANGE_REGEX = re.compile(r'-?\d+(?:\.\d+)?\s+to\s+-?\d+(?:\.\d+)?')
+NON_NAME_CHAR_REGEX = re.compile(r'[^a-z0-9_]')
+MULTI_UNDERSCORE_REGEX = re.compile(r'_+')
+WHITESPACE_REGEX = re.compile(r'\s+')
+# Common words in the Unit column that aren't units
+UNIT_FILLER_WORD_REGEXES = [
+    re.compile(rf'\b{word}\b', re.IGNORECASE) for word in ("maybe", "constant", "description")
+]
 
+
+@lru_cache(maxsize=64)
 def normalize_type(type_str: str) -> str:
     """
     Normalize type string to standard format.
@@ -69,7 +83,7 @@ def extract_min_max_from_unit(unit_str: str) -> Tuple[Optional[str], Optional[st
         return None, None
     
     # Look for range pattern: "-X to Y" or "X to Y"
-    range_match = re.search(r'(-?\d+(?:\.\d+)?)\s+to\s+(-?\d+(?:\.\d+)?)', unit_str, re.IGNORECASE)
+    range_match = RANGE_REGEX.search(unit_str)
     if range_match:
         min_val = range_match.group(1)
         max_val = range_match.group(2)
@@ -91,14 +105,14 @@ def normalize_parameter_name(variable_name: str, tab: str = "") -> str:
     """
     # Clean variable name
     param_name_base = variable_name.lower().replace(' ', '_').replace('/', '_')
-    param_name_base = re.sub(r'[^a-z0-9_]', '_', param_name_base)
-    param_name_base = re.sub(r'_+', '_', param_name_base).strip('_')
+    param_name_base = NON_NAME_CHAR_REGEX.sub('_', param_name_base)
+    param_name_base = MULTI_UNDERSCORE_REGEX.sub('_', param_name_base).strip('_')
     
     # Add tab prefix if provided
     if tab and tab.strip():
         tab_prefix = tab.lower().replace(' ', '_')
-        tab_prefix = re.sub(r'[^a-z0-9_]', '_', tab_prefix)
-        tab_prefix = re.sub(r'_+', '_', tab_prefix).strip('_')
+        tab_prefix = NON_NAME_CHAR_REGEX.sub('_', tab_prefix)
+        tab_prefix = MULTI_UNDERSCORE_REGEX.sub('_', tab_prefix).strip('_')
         param_name = f"{tab_prefix}_{param_name_base}"
     else:
         param_name = param_name_base
@@ -144,16 +158,15 @@ def parse_csv_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
     # Clean up unit string (remove range info)
     clean_unit = unit
     if "expected value of" in clean_unit.lower():
-        clean_unit = re.sub(r'expected value of\s+-?\d+(?:\.\d+)?\s+to\s+-?\d+(?:\.\d+)?', '', clean_unit, flags=re.IGNORECASE)
-        clean_unit = re.sub(r'-?\d+(?:\.\d+)?\s+to\s+-?\d+(?:\.\d+)?', '', clean_unit)
+        clean_unit = EXPECTED_RANGE_REGEX.sub('', clean_unit)
+        clean_unit = BARE_RANGE_REGEX.sub('', clean_unit)
         clean_unit = clean_unit.strip()
     
     # Remove common words that aren't units
-    unit_words_to_remove = ["maybe", "constant", "description"]
-    for word in unit_words_to_remove:
-        clean_unit = re.sub(rf'\b{word}\b', '', clean_unit, flags=re.IGNORECASE)
+    for word_regex in UNIT_FILLER_WORD_REGEXES:
+        clean_unit = word_regex.sub('', clean_unit)
     
-    clean_unit = re.sub(r'\s+', ' ', clean_unit).strip()
+    clean_unit = WHITESPACE_REGEX.sub(' ', clean_unit).strip()
     
     # Create display name (clean variable name)
     display_name = variable_name.replace('?', '').strip()
@@ -197,6 +210,73 @@ def parse_csv_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
     return param_def
 
 
+def _import_rows(reader: csv.DictReader, results: Dict[str, Any], overwrite_existing: bool):
+    """
+    Parse CSV rows and save all accepted definitions with a single write.
+    Updates the results dictionary in place.
+    """
+    existing_link_keys = {
+        p["link_key"] for p in get_all_car_parameter_definitions() if p.get("link_key")
+    }
+    pending = []
+    
+    for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is header
+        results["total_rows"] += 1
+        
+        try:
+            # Skip empty rows
+            if not any(row.values()):
+                continue
+            
+            # Parse row
+            param_def = parse_csv_row(row)
+            
+            if not param_def:
+                results["skipped"] += 1
+                continue
+            
+            # Check if already exists (including rows earlier in this file)
+            existing = param_def["link_key"] in existing_link_keys
+            
+            if existing and not overwrite_existing:
+                results["skipped"] += 1
+                continue
+            
+            pending.append({
+                "parameter_name": param_def["parameter_name"],
+                "display_name": param_def["display_name"],
+                "subteam": param_def["subteam"],
+                "unit": param_def["unit"],
+                "default_value": param_def["default_value"],
+                "min_value": param_def["min_value"] or None,
+                "max_value": param_def["max_value"] or None,
+                "description": param_def.get("description"),
+                "link_key": param_def["link_key"],
+                "tab": param_def["tab"],
+                "inject_type": param_def["inject_type"],
+                "variable_name": param_def["variable_name"],
+                "param_type": param_def["type"]
+            })
+            existing_link_keys.add(param_def["link_key"])
+            
+            if existing:
+                results["updated"] += 1
+            else:
+                results["created"] += 1
+        
+        except Exception as e:
+            results["errors"].append(f"Row {row_num}: Error processing row - {str(e)}")
+            results["skipped"] += 1
+    
+    # Write every accepted definition in one save instead of one save per row
+    try:
+        add_car_parameter_definitions(pending)
+    except Exception as e:
+        results["errors"].append(f"Failed to save {len(pending)} parameter definitions: {str(e)}")
+        results["created"] = 0
+        results["updated"] = 0
+
+
 def import_csv_file(csv_file_path: Path, overwrite_existing: bool = False) -> Dict[str, Any]:
     """
     Import parameter definitions from CSV file.
@@ -240,56 +320,7 @@ def import_csv_file(csv_file_path: Path, overwrite_existing: bool = False) -> Di
             # Parse CSV
             reader = csv.DictReader(f, delimiter=delimiter)
             
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is header
-                results["total_rows"] += 1
-                
-                try:
-                    # Skip empty rows
-                    if not any(row.values()):
-                        continue
-                    
-                    # Parse row
-                    param_def = parse_csv_row(row)
-                    
-                    if not param_def:
-                        results["skipped"] += 1
-                        continue
-                    
-                    # Check if already exists
-                    existing = get_car_parameter_definition_by_link_key(param_def["link_key"])
-                    
-                    if existing and not overwrite_existing:
-                        results["skipped"] += 1
-                        continue
-                    
-                    # Add or update definition
-                    success = add_car_parameter_definition(
-                        parameter_name=param_def["parameter_name"],
-                        display_name=param_def["display_name"],
-                        subteam=param_def["subteam"],
-                        unit=param_def["unit"],
-                        default_value=param_def["default_value"],
-                        min_value=param_def["min_value"] or None,
-                        max_value=param_def["max_value"] or None,
-                        description=param_def.get("description"),
-                        link_key=param_def["link_key"],
-                        tab=param_def["tab"],
-                        inject_type=param_def["inject_type"],
-                        variable_name=param_def["variable_name"],
-                        param_type=param_def["type"]
-                    )
-                    
-                    if success:
-                        if existing:
-                            results["updated"] += 1
-                        else:
-                            results["created"] += 1
-                    else:
-                        results["errors"].append(f"Row {row_num}: Failed to save parameter {param_def['link_key']}")
-                
-                except Exception as e:
-                    results["errors"].append(f"Row {row_num}: Error processing row - {str(e)}")
-                    results["skipped"] += 1
+            _import_rows(reader, results, overwrite_existing)
     
     except Exception as e:
         results["errors"].append(f"Error reading CSV file: {str(e)}")
@@ -327,56 +358,7 @@ def import_csv_content(csv_content: str, overwrite_existing: bool = False) -> Di
         # Parse CSV from string
         reader = csv.DictReader(StringIO(csv_content), delimiter=delimiter)
         
-        for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is header
-            results["total_rows"] += 1
-            
-            try:
-                # Skip empty rows
-                if not any(row.values()):
-                    continue
-                
-                # Parse row
-                param_def = parse_csv_row(row)
-                
-                if not param_def:
-                    results["skipped"] += 1
-                    continue
-                
-                # Check if already exists
-                existing = get_car_parameter_definition_by_link_key(param_def["link_key"])
-                
-                if existing and not overwrite_existing:
-                    results["skipped"] += 1
-                    continue
-                
-                # Add or update definition
-                success = add_car_parameter_definition(
-                    parameter_name=param_def["parameter_name"],
-                    display_name=param_def["display_name"],
-                    subteam=param_def["subteam"],
-                    unit=param_def["unit"],
-                    default_value=param_def["default_value"],
-                    min_value=param_def["min_value"] or None,
-                    max_value=param_def["max_value"] or None,
-                    description=param_def.get("description"),
-                    link_key=param_def["link_key"],
-                    tab=param_def["tab"],
-                    inject_type=param_def["inject_type"],
-                    variable_name=param_def["variable_name"],
-                    param_type=param_def["type"]
-                )
-                
-                if success:
-                    if existing:
-                        results["updated"] += 1
-                    else:
-                        results["created"] += 1
-                else:
-                    results["errors"].append(f"Row {row_num}: Failed to save parameter {param_def['link_key']}")
-            
-            except Exception as e:
-                results["errors"].append(f"Row {row_num}: Error processing row - {str(e)}")
-                results["skipped"] += 1
+        _import_rows(reader, results, overwrite_existing)
     
     except Exception as e:
         results["errors"].append(f"Error parsing CSV content: {str(e)}")
@@ -3,10 +3,13 @@ SQLite database setup and queries for parameter management system
 Optimized for Raspberry Pi performance
 """
 import aiosqlite
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 import os
+import sqlite3
 from .config.settings import settings
 
 # Database file path
@@ -17,10 +20,103 @@ DB_PATH = BASE_DIR / "data" / "parameters.db"
 # Ensure data directory exists
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# INSERT/UPDATE ... RETURNING needs SQLite 3.35+ (older Raspberry Pi OS images ship 3.34)
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+PARAMETER_COLUMNS = "id, parameter_name, subteam, current_value, updated_at, updated_by"
+
+# Connection pool - SQLite serializes writers, so keep one long-lived writer
+# connection and a few read-only reader connections (WAL lets them run alongside the writer)
+READER_POOL_SIZE = 4
+_writer: Optional[aiosqlite.Connection] = None
+_writer_lock: Optional[asyncio.Lock] = None
+_writer_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+_idle_readers: List[aiosqlite.Connection] = []
+
+
+async def _open_connection(read_only: bool) -> aiosqlite.Connection:
+    """Open a pooled connection"""
+    db = aiosqlite.connect(str(DB_PATH))
+    # Pooled connections live for the whole process - don't block interpreter exit
+    db.daemon = True
+    await db
+    db.row_factory = aiosqlite.Row
+    if read_only:
+        await db.execute("PRAGMA query_only = ON")
+    else:
+        await db.execute("PRAGMA journal_mode = WAL")
+    return db
+
+
+def _get_writer_lock() -> asyncio.Lock:
+    """Get the writer lock for the running event loop"""
+    global _writer_lock, _writer_lock_loop
+    loop = asyncio.get_running_loop()
+    if _writer_lock is None or _writer_lock_loop is not loop:
+        _writer_lock = asyncio.Lock()
+        _writer_lock_loop = loop
+    return _writer_lock
+
+
+@asynccontextmanager
+async def get_writer():
+    """Use the shared writer connection (one writer at a time)"""
+    global _writer
+    async with _get_writer_lock():
+        if _writer is None:
+            _writer = await _open_connection(read_only=False)
+        try:
+            yield _writer
+        finally:
+            # Never hand the next writer a half-finished transaction
+            if _writer.in_transaction:
+                await _writer.rollback()
+
+
+@asynccontextmanager
+async def get_reader():
+    """Borrow a read-only connection from the reader pool"""
+    db = _idle_readers.pop() if _idle_readers else await _open_connection(read_only=True)
+    try:
+        yield db
+    finally:
+        if len(_idle_readers) < READER_POOL_SIZE:
+            _idle_readers.append(db)
+        else:
+            await db.close()
+
+
+async def close_db():
+    """Close all pooled connections"""
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
+    while _idle_readers:
+        await _idle_readers.pop().close()
+
+
+async def _fetch_all(sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    """Run a SELECT and return all rows as dicts"""
+    async with get_reader() as db:
+        cursor = await db.execute(sql, params)
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+async def _fetch_one(sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+    """Run a SELECT and return the first row as a dict (or None)"""
+    async with get_reader() as db:
+        cursor = await db.execute(sql, params)
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
 
-async def get_db():
-    """Get database connection"""
-    return await aiosqlite.connect(str(DB_PATH))
+async def _execute(sql: str, params: tuple = ()) -> int:
+    """Run a single write statement, commit, and return the affected row count"""
+    async with get_writer() as db:
+        cursor = await db.execute(sql, params)
+        await db.commit()
+        return cursor.rowcount
 
 
 async def reset_database(keep_users: bool = True):
@@ -34,8 +130,7 @@ async def reset_database(keep_users: bool = True):
     Returns:
         Dict with counts of deleted records
     """
-    db = await get_db()
-    try:
+    async with get_writer() as db:
         await db.execute("PRAGMA foreign_keys = ON")
         
         # Get counts before deletion
@@ -75,14 +170,11 @@ async def reset_database(keep_users: bool = True):
             "queue_deleted": queue_count,
             "users_deleted": user_count if not keep_users else "kept"
         }
-    finally:
-        await db.close()
 
 
 async def init_db():
     """Initialize database tables"""
-    db = await get_db()
-    try:
+    async with get_writer() as db:
         # Enable foreign keys
         await db.execute("PRAGMA foreign_keys = ON")
         
@@ -182,7 +274,6 @@ async def init_db():
         await db.execute("CREATE INDEX IF NOT EXISTS idx_history_parameter ON parameter_history(parameter_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_history_name ON parameter_history(parameter_name)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_history_form ON parameter_history(form_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_queue_status ON parameter_queue(status)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_queue_form ON parameter_queue(form_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_queue_car ON parameter_queue(car_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_queue_status_car ON parameter_queue(status, car_id)")
@@ -190,6 +281,19 @@ async def init_db():
         await db.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_cars_identifier ON cars(car_identifier)")
         
+        # Partial index for the pending queue (dashboard polling) - only holds pending rows,
+        # so it stays small as processed items accumulate and also satisfies ORDER BY submitted_at
+        await db.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_queue_pending ON parameter_queue(submitted_at DESC)
+            WHERE status = '{settings.QUEUE_STATUS_PENDING}'
+        """)
+        
+        # idx_queue_status is covered by the (status, car_id) prefix
+        await db.execute("DROP INDEX IF EXISTS idx_queue_status")
+        
+        # Refresh planner statistics so the partial index is chosen once the queue grows
+        await db.execute("ANALYZE parameter_queue")
+        
         # Initialize default admin user if users table is empty
         cursor = await db.execute("SELECT COUNT(*) FROM users")
         count = (await cursor.fetchone())[0]
@@ -204,116 +308,64 @@ async def init_db():
             await db.commit()
         
         await db.commit()
-    finally:
-        await db.close()
 
 
 async def get_all_parameters(subteam: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get all parameters, sorted alphabetically by name"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        
-        if subteam:
-            cursor = await db.execute(
-                "SELECT * FROM parameters WHERE subteam = ? ORDER BY parameter_name ASC",
-                (subteam,)
-            )
-        else:
-            cursor = await db.execute(
-                "SELECT * FROM parameters ORDER BY parameter_name ASC"
-            )
-        
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        await db.close()
+    if subteam:
+        return await _fetch_all(
+            "SELECT * FROM parameters WHERE subteam = ? ORDER BY parameter_name ASC",
+            (subteam,)
+        )
+    return await _fetch_all("SELECT * FROM parameters ORDER BY parameter_name ASC")
 
 
 async def get_parameter(parameter_name: str) -> Optional[Dict[str, Any]]:
     """Get a single parameter by name"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT * FROM parameters WHERE parameter_name = ?",
-            (parameter_name,)
-        )
-        row = await cursor.fetchone()
-        return dict(row) if row else None
-    finally:
-        await db.close()
+    return await _fetch_one(
+        "SELECT * FROM parameters WHERE parameter_name = ?",
+        (parameter_name,)
+    )
 
 
 async def search_parameters(query: str) -> List[Dict[str, Any]]:
     """Search parameters by name (case-insensitive)"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            "SELECT * FROM parameters WHERE parameter_name LIKE ? ORDER BY parameter_name ASC",
-            (f"%{query}%",)
-        )
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        await db.close()
+    return await _fetch_all(
+        "SELECT * FROM parameters WHERE parameter_name LIKE ? ORDER BY parameter_name ASC",
+        (f"%{query}%",)
+    )
 
 
 
 
 async def get_parameter_history(parameter_name: str) -> List[Dict[str, Any]]:
     """Get history for a specific parameter"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute(
-            """
-            SELECT * FROM parameter_history 
-            WHERE parameter_name = ? 
-            ORDER BY updated_at DESC
-            """,
-            (parameter_name,)
-        )
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        await db.close()
+    return await _fetch_all(
+        """
+        SELECT * FROM parameter_history 
+        WHERE parameter_name = ? 
+        ORDER BY updated_at DESC
+        """,
+        (parameter_name,)
+    )
 
 
 async def get_all_subteams() -> List[str]:
     """Get list of all unique subteams"""
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT DISTINCT subteam FROM parameters ORDER BY subteam ASC")
-        rows = await cursor.fetchall()
-        return [row[0] for row in rows]
-    finally:
-        await db.close()
+    rows = await _fetch_all("SELECT DISTINCT subteam FROM parameters ORDER BY subteam ASC")
+    return [row["subteam"] for row in rows]
 
 
 # User roles functions
 async def get_user_role(username: str) -> Optional[str]:
     """Get user role"""
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT role FROM users WHERE username = ?", (username,))
-        row = await cursor.fetchone()
-        return row[0] if row else None
-    finally:
-        await db.close()
+    row = await _fetch_one("SELECT role FROM users WHERE username = ?", (username,))
+    return row["role"] if row else None
 
 
 async def get_all_users() -> List[Dict[str, Any]]:
     """Get all users with their roles"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute("SELECT id, username, role, created_at FROM users ORDER BY username ASC")
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        await db.close()
+    return await _fetch_all("SELECT id, username, role, created_at FROM users ORDER BY username ASC")
 
 
 async def create_user(username: str, password: str, role: Optional[str] = None, subteam: Optional[str] = None) -> bool:
@@ -322,81 +374,57 @@ async def create_user(username: str, password: str, role: Optional[str] = None,
     from datetime import datetime
     from internal.registered_users import add_registered_user
     
-    db = await get_db()
-    try:
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        created_at = datetime.now().isoformat()
-        await db.execute("""
-            INSERT INTO users (username, password_hash, role, subteam)
-            VALUES (?, ?, ?, ?)
-        """, (username, password_hash, role, subteam))
-        await db.commit()
-        
-        # Add to registered users JSON with plaintext password for visibility
-        add_registered_user(username, user_role, created_at, password, subteam)
-        
-        return True
-    except aiosqlite.IntegrityError:
-        return False  # Username already exists
-    finally:
-        await db.close()
+    password_hash = hashlib.sha256(password.encode()).hexdigest()
+    created_at = datetime.now().isoformat()
+    async with get_writer() as db:
+        try:
+            await db.execute("""
+                INSERT INTO users (username, password_hash, role, subteam)
+                VALUES (?, ?, ?, ?)
+            """, (username, password_hash, role, subteam))
+            await db.commit()
+        except aiosqlite.IntegrityError:
+            return False  # Username already exists
+    
+    # Add to registered users JSON with plaintext password for visibility
+    add_registered_user(username, user_role, created_at, password, subteam)
+    
+    return True
 
 
 async def update_user_role(username: str, role: str) -> bool:
     """Update user role in database and registered_users.json"""
     from internal.registered_users import update_user_role as update_json_role
     
-    db = await get_db()
-    try:
-        cursor = await db.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
-        await db.commit()
-        
-        if cursor.rowcount > 0:
-            # Also update in registered users JSON
-            update_json_role(username, role)
-            return True
-        return False
-    finally:
-        await db.close()
+    if await _execute("UPDATE users SET role = ? WHERE username = ?", (role, username)) > 0:
+        # Also update in registered users JSON
+        update_json_role(username, role)
+        return True
+    return False
 
 
 async def update_user_password(username: str, password: str) -> bool:
     """Update user password in database (hashed)"""
     import hashlib
-    db = await get_db()
-    try:
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        cursor = await db.execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username))
-        await db.commit()
-        return cursor.rowcount > 0
-    finally:
-        await db.close()
+    password_hash = hashlib.sha256(password.encode()).hexdigest()
+    return await _execute("UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username)) > 0
 
 
 async def update_user_subteam(username: str, subteam: Optional[str]) -> bool:
     """Update user subteam in database and registered_users.json"""
     from internal.registered_users import update_user_subteam as update_json_subteam
     
-    db = await get_db()
-    try:
-        cursor = await db.execute("UPDATE users SET subteam = ? WHERE username = ?", (subteam, username))
-        await db.commit()
-        
-        if cursor.rowcount > 0:
-            # Also update in registered users JSON
-            update_json_subteam(username, subteam)
-            return True
-        return False
-    finally:
-        await db.close()
+    if await _execute("UPDATE users SET subteam = ? WHERE username = ?", (subteam, username)) > 0:
+        # Also update in registered users JSON
+        update_json_subteam(username, subteam)
+        return True
+    return False
 
 
 async def delete_user(username: str) -> Optional[Dict[str, Any]]:
     """Delete a user and return user info before deletion"""
-    db = await get_db()
-    try:
+    async with get_writer() as db:
         # Get user info before deletion (including subteam)
-        db.row_factory = aiosqlite.Row
         cursor = await db.execute("SELECT username, role, subteam FROM users WHERE username = ?", (username,))
         row = await cursor.fetchone()
         
@@ -410,8 +438,6 @@ async def delete_user(username: str) -> Optional[Dict[str, Any]]:
         await db.commit()
         
         return user_info
-    finally:
-        await db.close()
 
 
 async def verify_user_password(username: str, password: str) -> bool:
@@ -419,16 +445,8 @@ async def verify_user_password(username: str, password: str) -> bool:
     import hashlib
     password_hash = hashlib.sha256(password.encode()).hexdigest()
     
-    db = await get_db()
-    try:
-        cursor = await db.execute(
-            "SELECT password_hash FROM users WHERE username = ?",
-            (username,)
-        )
-        row = await cursor.fetchone()
-        return row[0] == password_hash if row else False
-    finally:
-        await db.close()
+    row = await _fetch_one("SELECT password_hash FROM users WHERE username = ?", (username,))
+    return row["password_hash"] == password_hash if row else False
 
 
 # Queue functions
@@ -446,58 +464,42 @@ async def add_to_queue(
     form_id = str(uuid.uuid4())
     now = datetime.now().isoformat()
     
-    db = await get_db()
-    try:
-        await db.execute("""
-            INSERT INTO parameter_queue 
-            (parameter_name, subteam, new_value, current_value, submitted_by, submitted_at, comment, form_id, car_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (parameter_name, subteam, new_value, current_value, submitted_by, now, comment, form_id, car_id))
-        await db.commit()
-        return form_id
-    finally:
-        await db.close()
+    await _execute("""
+        INSERT INTO parameter_queue 
+        (parameter_name, subteam, new_value, current_value, submitted_by, submitted_at, comment, form_id, car_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (parameter_name, subteam, new_value, current_value, submitted_by, now, comment, form_id, car_id))
+    return form_id
 
 
 async def get_queue(status: Optional[str] = None, car_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get queue items, optionally filtered by status and/or car_id"""
-    db = await get_db()
-    try:
-        db.row_factory = aiosqlite.Row
-        
-        conditions = []
-        params = []
-        
-        if status:
-            conditions.append("status = ?")
-            params.append(status)
-        
-        if car_id:
-            conditions.append("car_id = ?")
-            params.append(car_id)
-        
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-        
-        cursor = await db.execute(
-            f"SELECT * FROM parameter_queue WHERE {where_clause} ORDER BY submitted_at DESC",
-            tuple(params)
-        )
-        
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        await db.close()
+    conditions = []
+    params = []
+    
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    
+    if car_id:
+        conditions.append("car_id = ?")
+        params.append(car_id)
+    
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    
+    return await _fetch_all(
+        f"SELECT * FROM parameter_queue WHERE {where_clause} ORDER BY submitted_at DESC",
+        tuple(params)
+    )
 
 
 async def process_queue_item(form_id: str, processed_by: str) -> bool:
     """Process a queue item and apply the change"""
-    db = await get_db()
-    try:
+    async with get_writer() as db:
         # Use transaction for safety
         await db.execute("BEGIN IMMEDIATE")
         
         # Get queue item (with lock)
-        db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             f"SELECT * FROM parameter_queue WHERE form_id = ? AND status IN ('{settings.QUEUE_STATUS_PENDING}', '{settings.QUEUE_STATUS_AUTO_APPLIED}')",
             (form_id,)
@@ -516,8 +518,9 @@ async def process_queue_item(form_id: str, processed_by: str) -> bool:
             await db.commit()
             return True
         
-        # Apply the change
-        await update_parameter(
+        # Apply the change in this transaction (update_parameter would wait on the writer we hold)
+        await _write_parameter(
+            db,
             parameter_name=item_dict["parameter_name"],
             subteam=item_dict["subteam"],
             new_value=item_dict["new_value"],
@@ -538,27 +541,16 @@ async def process_queue_item(form_id: str, processed_by: str) -> bool:
         await db.execute(f"UPDATE parameter_queue SET status = '{settings.QUEUE_STATUS_PROCESSED}' WHERE form_id = ?", (form_id,))
         await db.commit()
         return True
-    except Exception as e:
-        await db.rollback()
-        raise
-    finally:
-        await db.close()
 
 
 async def reject_queue_item(form_id: str) -> bool:
     """Reject a queue item. Uses transaction for safety."""
-    db = await get_db()
-    try:
+    async with get_writer() as db:
         # Use transaction for safety
         await db.execute("BEGIN IMMEDIATE")
         cursor = await db.execute(f"UPDATE parameter_queue SET status = '{settings.QUEUE_STATUS_REJECTED}' WHERE form_id = ?", (form_id,))
         await db.commit()
         return cursor.rowcount > 0
-    except Exception as e:
-        await db.rollback()
-        raise
-    finally:
-        await db.close()
 
 
 # Enhanced update function with comment and form_id
@@ -575,68 +567,69 @@ async def update_parameter(
     Returns the updated parameter.
     Uses transaction for safety.
     """
-    now = datetime.now().isoformat()
-    
-    db = await get_db()
-    try:
+    async with get_writer() as db:
         # Use transaction for safety
         await db.execute("BEGIN IMMEDIATE")
-        
-        db.row_factory = aiosqlite.Row
-        
-        # Get current parameter to capture prior value (with lock)
-        cursor = await db.execute(
-            "SELECT * FROM parameters WHERE parameter_name = ?",
-            (parameter_name,)
-        )
-        existing_row = await cursor.fetchone()
-        existing = dict(existing_row) if existing_row else None
-        prior_value = existing["current_value"] if existing else None
-        parameter_id = existing["id"] if existing else None
-        
-        if existing:
-            # Update existing parameter
-            await db.execute("""
-                UPDATE parameters 
-                SET subteam = ?, current_value = ?, updated_at = ?, updated_by = ?
-                WHERE parameter_name = ?
-            """, (subteam, new_value, now, updated_by, parameter_name))
-            
-            # Get the parameter_id if we don't have it
-            if not parameter_id:
-                cursor = await db.execute(
-                    "SELECT id FROM parameters WHERE parameter_name = ?",
-                    (parameter_name,)
-                )
-                row = await cursor.fetchone()
-                parameter_id = row[0] if row else None
-        else:
-            # Insert new parameter
-            cursor = await db.execute("""
-                INSERT INTO parameters (parameter_name, subteam, current_value, updated_at, updated_by)
-                VALUES (?, ?, ?, ?, ?)
-            """, (parameter_name, subteam, new_value, now, updated_by))
-            
-            parameter_id = cursor.lastrowid
-        
-        # Create history entry with comment and form_id
-        await db.execute("""
-            INSERT INTO parameter_history 
-            (parameter_id, parameter_name, subteam, prior_value, new_value, updated_by, updated_at, comment, form_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (parameter_id, parameter_name, subteam, prior_value, new_value, updated_by, now, comment, form_id))
-        
+        updated = await _write_parameter(db, parameter_name, subteam, new_value, updated_by, comment, form_id)
         await db.commit()
-        
-        # Return updated parameter (need to fetch it)
-        cursor = await db.execute(
-            "SELECT * FROM parameters WHERE parameter_name = ?",
-            (parameter_name,)
-        )
-        row = await cursor.fetchone()
-        return dict(row) if row else {}
-    except Exception as e:
-        await db.rollback()
-        raise
-    finally:
-        await db.close()
+        return updated
+
+
+async def _write_parameter(
+    db: aiosqlite.Connection,
+    parameter_name: str,
+    subteam: str,
+    new_value: str,
+    updated_by: str,
+    comment: Optional[str] = None,
+    form_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Upsert a parameter and its history entry inside the caller's writer transaction"""
+    now = datetime.now().isoformat()
+    
+    # Get current parameter to capture prior value (with lock)
+    cursor = await db.execute(
+        "SELECT * FROM parameters WHERE parameter_name = ?",
+        (parameter_name,)
+    )
+    existing_row = await cursor.fetchone()
+    existing = dict(existing_row) if existing_row else None
+    prior_value = existing["current_value"] if existing else None
+    returning = f" RETURNING {PARAMETER_COLUMNS}" if SUPPORTS_RETURNING else ""
+    
+    if existing:
+        # Update existing parameter
+        cursor = await db.execute(f"""
+            UPDATE parameters 
+            SET subteam = ?, current_value = ?, updated_at = ?, updated_by = ?
+            WHERE parameter_name = ?{returning}
+        """, (subteam, new_value, now, updated_by, parameter_name))
+    else:
+        # Insert new parameter
+        cursor = await db.execute(f"""
+            INSERT INTO parameters (parameter_name, subteam, current_value, updated_at, updated_by)
+            VALUES (?, ?, ?, ?, ?){returning}
+        """, (parameter_name, subteam, new_value, now, updated_by))
+    
+    if SUPPORTS_RETURNING:
+        updated = dict(await cursor.fetchone())
+    else:
+        # No RETURNING - every column was just written, so build the row locally
+        updated = {
+            "id": existing["id"] if existing else cursor.lastrowid,
+            "parameter_name": parameter_name,
+            "subteam": subteam,
+            "current_value": new_value,
+            "updated_at": now,
+            "updated_by": updated_by
+        }
+    parameter_id = updated["id"]
+    
+    # Create history entry with comment and form_id
+    await db.execute("""
+        INSERT INTO parameter_history 
+        (parameter_id, parameter_name, subteam, prior_value, new_value, updated_by, updated_at, comment, form_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (parameter_id, parameter_name, subteam, prior_value, new_value, updated_by, now, comment, form_id))
+    
+    return updated
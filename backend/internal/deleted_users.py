@@ -2,7 +2,7 @@
 Manage recently deleted users in JSON file
 Users in this file are denied login access
 """
-import json
+import orjson
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -15,25 +15,23 @@ def ensure_deleted_users_file():
     """Ensure the deleted users file exists"""
     DELETED_USERS_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not DELETED_USERS_FILE.exists():
-        with open(DELETED_USERS_FILE, 'w') as f:
-            json.dump([], f)
+        DELETED_USERS_FILE.write_bytes(b"[]")
 
 
 def load_deleted_users() -> List[Dict[str, Any]]:
     """Load recently deleted users from JSON file"""
     ensure_deleted_users_file()
     try:
-        with open(DELETED_USERS_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
+        return orjson.loads(DELETED_USERS_FILE.read_bytes())
+    except (orjson.JSONDecodeError, FileNotFoundError):
         return []
 
 
 def save_deleted_users(users: List[Dict[str, Any]]):
     """Save recently deleted users to JSON file"""
     ensure_deleted_users_file()
-    with open(DELETED_USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2, default=str)
+    # Timestamps are stored as ISO strings, so no default= fallback is needed
+    DELETED_USERS_FILE.write_bytes(orjson.dumps(users, option=orjson.OPT_INDENT_2))
 
 
 def add_deleted_user(username: str, role: str, deleted_by: str, subteam: Optional[str] = None) -> bool:
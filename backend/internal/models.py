@@ -1,22 +1,22 @@
 """
-Pydantic models for parameter management system
+Models for parameter management system
+Request bodies are Pydantic models (validated); read-only row types are slotted dataclasses
 """
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 
 
-class Parameter(BaseModel):
-    """Current parameter state"""
-    id: Optional[int] = None
+@dataclass(slots=True, frozen=True)
+class Parameter:
+    """Current parameter state (fields in parameters column order)"""
+    id: Optional[int]
     parameter_name: str
     subteam: str
     current_value: str
     updated_at: str
     updated_by: str
-    
-    class Config:
-        from_attributes = True
 
 
 class ParameterUpdate(BaseModel):
@@ -27,8 +27,8 @@ class ParameterUpdate(BaseModel):
     comment: Optional[str] = Field(None, description="Optional comment about the change")
     queue: bool = Field(False, description="Whether to add to queue for admin approval")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "parameter_name": "max_rpm",
                 "subteam": "Engine",
@@ -37,10 +37,12 @@ class ParameterUpdate(BaseModel):
                 "queue": False
             }
         }
+    )
 
 
-class ParameterHistory(BaseModel):
-    """Audit trail entry"""
+@dataclass(slots=True, frozen=True)
+class ParameterHistory:
+    """Audit trail entry (fields in parameter_history column order)"""
     id: int
     parameter_id: int
     parameter_name: str
@@ -51,13 +53,11 @@ class ParameterHistory(BaseModel):
     updated_at: str
     comment: Optional[str] = None
     form_id: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
 
 
-class QueueItem(BaseModel):
-    """Queue item for pending parameter changes"""
+@dataclass(slots=True, frozen=True)
+class QueueItem:
+    """Queue item for pending parameter changes (fields in parameter_queue column order)"""
     id: int
     parameter_name: str
     subteam: str
@@ -65,24 +65,20 @@ class QueueItem(BaseModel):
     current_value: Optional[str]
     submitted_by: str
     submitted_at: str
-    comment: Optional[str] = None
+    comment: Optional[str]
     status: str
     form_id: str
-    
-    class Config:
-        from_attributes = True
+    car_id: Optional[str] = None
 
 
-class User(BaseModel):
+@dataclass(slots=True, frozen=True)
+class User:
     """User with role"""
     id: int
     username: str
     role: str
-    subteam: Optional[str] = None
+    subteam: Optional[str]
     created_at: str
-    
-    class Config:
-        from_attributes = True
 
 
 class UserCreate(BaseModel):
@@ -93,16 +89,14 @@ class UserCreate(BaseModel):
     subteam: str = Field(..., min_length=1, description="Subteam assignment (required)")
 
 
-class Car(BaseModel):
-    """Car identification"""
+@dataclass(slots=True, frozen=True)
+class Car:
+    """Car identification (fields in cars column order)"""
     id: int
     car_identifier: str
-    display_name: Optional[str] = None
+    display_name: Optional[str]
     created_at: str
     last_seen_at: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
 
 
 class CarCreate(BaseModel):
@@ -128,9 +122,9 @@ class CarParameterDefinition(BaseModel):
     variable_name: Optional[str] = Field(None, description="Variable name from CSV")
     type: Optional[str] = Field(None, description="Parameter type: int, float, string, dropdown")
     
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "parameter_name": "damper_fl_hs_rebound",
                 "display_name": "FL HS Rebound",
@@ -143,3 +137,4 @@ class CarParameterDefinition(BaseModel):
                 "inject_type": "Constant"
             }
         }
+    )
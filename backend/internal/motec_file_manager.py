@@ -2,8 +2,11 @@
 MoTeC File Manager - Handles .ldx and .ld file uploads and storage
 Lightweight file management for parameter system
 """
-import json
+import orjson
+import os
 import shutil
+import threading
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -19,21 +22,49 @@ MOTEC_FILES_DIR.mkdir(parents=True, exist_ok=True)
 (MOTEC_FILES_DIR / "ldx").mkdir(exist_ok=True)
 (MOTEC_FILES_DIR / "ld").mkdir(exist_ok=True)
 
+# Parsed metadata list + ID index, reused until the file's (mtime, size, inode) changes.
+# Read-only: load_metadata() hands out copies and save_metadata() invalidates it.
+_metadata_cache: Dict[str, Any] = {"key": None, "files": [], "by_id": {}}
+# Uploads are saved from worker threads - serialize cache refreshes and read-modify-write of the file
+_metadata_lock = threading.RLock()
+
 
 def load_metadata() -> List[Dict[str, Any]]:
     """Load file metadata from JSON"""
-    if not MOTEC_METADATA_FILE.exists():
-        return []
+    # Entries are copied so callers can mutate them without touching the cache
+    return [dict(file_meta) for file_meta in _cached_metadata()["files"]]
+
+
+def _cached_metadata() -> Dict[str, Any]:
+    """Get parsed metadata and ID index, re-reading the file only when it has changed"""
+    try:
+        stat = MOTEC_METADATA_FILE.stat()
+    except FileNotFoundError:
+        return {"key": None, "files": [], "by_id": {}}
     
+    key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _metadata_lock:
+        if _metadata_cache["key"] != key:
+            files = _read_metadata_file()
+            by_id = {}
+            for file_meta in files:
+                # First match wins, like the previous linear scan
+                by_id.setdefault(file_meta.get("id"), file_meta)
+            _metadata_cache.update(key=key, files=files, by_id=by_id)
+        
+        return _metadata_cache
+
+
+def _read_metadata_file() -> List[Dict[str, Any]]:
+    """Read and parse the metadata file from disk"""
     try:
-        with open(MOTEC_METADATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Ensure we return a list
-            if not isinstance(data, list):
-                print(f"Warning: Metadata file contains non-list data, returning empty list")
-                return []
-            return data
-    except json.JSONDecodeError as e:
+        data = orjson.loads(MOTEC_METADATA_FILE.read_bytes())
+        # Ensure we return a list
+        if not isinstance(data, list):
+            print(f"Warning: Metadata file contains non-list data, returning empty list")
+            return []
+        return data
+    except orjson.JSONDecodeError as e:
         print(f"Error: Invalid JSON in metadata file: {e}")
         # Return empty list instead of crashing
         return []
@@ -50,8 +81,15 @@ def save_metadata(metadata: List[Dict[str, Any]]):
     try:
         # Ensure directory exists
         MOTEC_METADATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(MOTEC_METADATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, default=str)
+        # Atomic write: a crash mid-save must not leave truncated JSON (load_metadata would read it as empty).
+        # Compact output - the file is machine-read only, so indentation just doubles its size
+        temp_path = MOTEC_METADATA_FILE.with_suffix(MOTEC_METADATA_FILE.suffix + '.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(orjson.dumps(metadata, default=str, option=orjson.OPT_NON_STR_KEYS))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, MOTEC_METADATA_FILE)
+        _metadata_cache["key"] = None
     except Exception as e:
         print(f"Error saving metadata: {e}")
         raise
@@ -92,19 +130,14 @@ def parse_ld_metadata(file_path: Path) -> Dict[str, Any]:
 
 
 def save_uploaded_file(file_content: bytes, filename: str, file_type: str) -> Dict[str, Any]:
-    """Save uploaded file and return metadata"""
-    # Determine subdirectory
-    subdir = "ldx" if filename.lower().endswith(settings.MOTEC_LDX_EXTENSION.lower()) else "ld"
-    if file_type == "ldx":
-        subdir = "ldx"
-    elif file_type == "ld":
-        subdir = "ld"
+    """Save uploaded file and return metadata (blocking - async callers should run it in a thread)"""
+    has_ldx_extension = filename.lower().endswith(settings.MOTEC_LDX_EXTENSION.lower())
+    
+    # Determine subdirectory - explicit file type wins, otherwise infer from extension
+    if file_type in ("ldx", "ld"):
+        subdir = file_type
     else:
-        # Infer from extension
-        if filename.lower().endswith(settings.MOTEC_LDX_EXTENSION.lower()):
-            subdir = "ldx"
-        else:
-            subdir = "ld"
+        subdir = "ldx" if has_ldx_extension else "ld"
     
     # Save file
     save_path = MOTEC_FILES_DIR / subdir / filename
@@ -112,18 +145,20 @@ def save_uploaded_file(file_content: bytes, filename: str, file_type: str) -> Di
         f.write(file_content)
     
     # Parse metadata
-    if file_type == "ldx" or filename.lower().endswith(settings.MOTEC_LDX_EXTENSION.lower()):
+    if file_type == "ldx" or has_ldx_extension:
         metadata = parse_ldx_metadata(save_path)
     else:
         metadata = parse_ld_metadata(save_path)
     
     metadata["file_path"] = str(save_path.relative_to(BASE_DIR))
-    metadata["id"] = f"{datetime.now().timestamp()}_{filename}"
+    # Random ID - timestamp IDs could collide for uploads in the same microsecond
+    metadata["id"] = str(uuid.uuid4())
     
     # Save to metadata file
-    all_metadata = load_metadata()
-    all_metadata.append(metadata)
-    save_metadata(all_metadata)
+    with _metadata_lock:
+        all_metadata = load_metadata()
+        all_metadata.append(metadata)
+        save_metadata(all_metadata)
     
     return metadata
 
@@ -135,26 +170,18 @@ def get_all_files() -> List[Dict[str, Any]]:
 
 def get_file_by_id(file_id: str) -> Optional[Dict[str, Any]]:
     """Get file metadata by ID"""
-    all_files = load_metadata()
-    for file_meta in all_files:
-        if file_meta.get("id") == file_id:
-            return file_meta
-    return None
+    file_meta = _cached_metadata()["by_id"].get(file_id)
+    return dict(file_meta) if file_meta is not None else None
 
 
 def delete_file(file_id: str) -> bool:
     """Delete file and its metadata"""
-    all_files = load_metadata()
-    file_meta = None
-    remaining_files = []
-    
-    for f in all_files:
-        if f.get("id") == file_id:
-            file_meta = f
-        else:
-            remaining_files.append(f)
-    
-    if file_meta:
+    with _metadata_lock:
+        cache = _cached_metadata()
+        file_meta = cache["by_id"].get(file_id)
+        if file_meta is None:
+            return False
+        
         # Delete actual file
         file_path_str = file_meta.get("file_path")
         if file_path_str:
@@ -165,16 +192,17 @@ def delete_file(file_id: str) -> bool:
                 except Exception:
                     pass  # File might already be deleted
         
-        # Update metadata
-        save_metadata(remaining_files)
+        # Update metadata - one filter pass over the cached list (save_metadata doesn't mutate entries)
+        save_metadata([f for f in cache["files"] if f.get("id") != file_id])
         return True
-    
-    return False
-
 
 def get_file_path(file_id: str) -> Optional[Path]:
     """Get full path to file by ID"""
-    file_meta = get_file_by_id(file_id)
+    return get_file_path_from_metadata(get_file_by_id(file_id))
+
+
+def get_file_path_from_metadata(file_meta: Optional[Dict[str, Any]]) -> Optional[Path]:
+    """Get full path to file from an already-loaded metadata entry"""
     if file_meta and file_meta.get("file_path"):
         return BASE_DIR / file_meta["file_path"]
     return None
@@ -1,42 +1,79 @@
 """
 MoTeC LDX Updater - Updates specific parameter values in existing LDX files
 """
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Optional, Dict, Any
 import hashlib
 import os
-import time
+from collections import OrderedDict
 from datetime import datetime
 from .motec_parser import MotecParser
+from .car_parameters import get_car_parameter_definition
+from .config.settings import settings
+
+# Prefer lxml (libxml2, C-speed parse/serialize) when installed, as motec_parser does.
+# Entity expansion is off so an uploaded LDX can't pull other files into the rewritten output.
+try:
+    from lxml import etree as ET
+    XML_PARSER = ET.XMLParser(resolve_entities=False)
+except ImportError:
+    import xml.etree.ElementTree as ET  # lxml not installed, use the standard library
+    XML_PARSER = None
+
+# LRU of the Ids present in each LDX file keyed by (path, mtime_ns, size, inode) - parameter updates
+# check every uploaded LDX file for the parameter, and most of them haven't changed since last time.
+# The inode catches this module's own os.replace rewrites even when size and mtime come out the same.
+LDX_IDS_CACHE_SIZE = 256
+_ldx_ids_cache: "OrderedDict[tuple, Dict[str, frozenset]]" = OrderedDict()
+
+# Accepted spellings of the MathItem/Descriptor field suffix in parameter names
+SCALE_FIELDS = frozenset({"scale", "Scale"})
+OFFSET_FIELDS = frozenset({"offset", "Offset"})
+DPS_FIELDS = frozenset({"dps", "DisplayDPS"})
+UNIT_FIELDS = frozenset({"unit", "DisplayUnit"})
 
 
 class MotecLdxUpdater:
     """Update parameter values in existing LDX files"""
     
     @staticmethod
-    def _get_file_hash(file_path: Path) -> str:
-        """Get SHA256 hash of file"""
+    def _get_file_hash(file_path: Path, data: Optional[bytes] = None) -> str:
+        """Get SHA256 hash of file (or of its already-read contents)"""
         try:
+            if data is not None:
+                return hashlib.sha256(data).hexdigest()
             with open(file_path, 'rb') as f:
                 return hashlib.sha256(f.read()).hexdigest()
         except Exception as e:
             return f"ERROR: {e}"
     
     @staticmethod
-    def _get_file_stats(file_path: Path) -> Dict[str, Any]:
-        """Get file statistics for debugging"""
+    def _get_file_stats(file_path: Path, data: Optional[bytes] = None) -> Dict[str, Any]:
+        """Get file statistics for debugging (file_path is already resolved by the caller)"""
         try:
-            stat = file_path.stat()
+            # One stat call answers exists/size/mtime (previously an exists() check per field)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                return {
+                    "exists": False,
+                    "size": 0,
+                    "mtime": 0,
+                    "mtime_str": "N/A",
+                    "readable": False,
+                    "writable": False,
+                    "absolute_path": str(file_path),
+                    "hash": "N/A"
+                }
             return {
-                "exists": file_path.exists(),
-                "size": stat.st_size if file_path.exists() else 0,
-                "mtime": stat.st_mtime if file_path.exists() else 0,
-                "mtime_str": datetime.fromtimestamp(stat.st_mtime).isoformat() if file_path.exists() else "N/A",
-                "readable": os.access(file_path, os.R_OK) if file_path.exists() else False,
-                "writable": os.access(file_path, os.W_OK) if file_path.exists() else False,
-                "absolute_path": str(file_path.resolve()),
-                "hash": MotecLdxUpdater._get_file_hash(file_path) if file_path.exists() else "N/A"
+                "exists": True,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "mtime_str": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "readable": os.access(file_path, os.R_OK),
+                "writable": os.access(file_path, os.W_OK),
+                "absolute_path": str(file_path),
+                "hash": MotecLdxUpdater._get_file_hash(file_path, data)
             }
         except Exception as e:
             return {"error": str(e)}
@@ -46,7 +83,8 @@ class MotecLdxUpdater:
         file_path: Path,
         parameter_name: str,
         new_value: str,
-        comment: Optional[str] = None
+        comment: Optional[str] = None,
+        durable: bool = True
     ) -> bool:
         """
         Update a specific parameter value in an existing LDX file
@@ -56,6 +94,9 @@ class MotecLdxUpdater:
             parameter_name: Name of the parameter (e.g., "ldx_details_Fastest_Time", "ldx_math_ID_scale")
             new_value: New value to set
             comment: Optional comment to include in documentation
+            durable: fsync the new content before the atomic replace so it survives a power loss.
+                Readers never see a half-written file either way. Every current caller keeps the default
+                (uploaded LDX files can't be regenerated) - False is only for future callers writing regenerable files
         
         Returns:
             True if update was successful, False otherwise
@@ -63,18 +104,28 @@ class MotecLdxUpdater:
         # Resolve absolute path (follow symlinks)
         file_path = file_path.resolve()
         
-        # Log BEFORE state
-        print(f"[LDX_UPDATER] === UPDATE START ===")
-        print(f"[LDX_UPDATER] Parameter: {parameter_name}")
-        print(f"[LDX_UPDATER] New value: {new_value}")
+        # BEFORE/AFTER stats, content hashes and the read-back check are diagnostics only
+        debug = settings.MOTEC_LDX_UPDATER_DEBUG
         
-        before_stats = MotecLdxUpdater._get_file_stats(file_path)
-        print(f"[LDX_UPDATER] BEFORE - Path: {before_stats.get('absolute_path')}")
-        print(f"[LDX_UPDATER] BEFORE - Exists: {before_stats.get('exists')}")
-        print(f"[LDX_UPDATER] BEFORE - Size: {before_stats.get('size')} bytes")
-        print(f"[LDX_UPDATER] BEFORE - mtime: {before_stats.get('mtime_str')}")
-        print(f"[LDX_UPDATER] BEFORE - Hash: {before_stats.get('hash')[:16]}...")
-        print(f"[LDX_UPDATER] BEFORE - Readable: {before_stats.get('readable')}, Writable: {before_stats.get('writable')}")
+        # Read the file once - the same bytes feed the BEFORE hash and the parse below
+        try:
+            raw = file_path.read_bytes()
+        except OSError:
+            raw = None
+        
+        if debug:
+            # Log BEFORE state
+            print(f"[LDX_UPDATER] === UPDATE START ===")
+            print(f"[LDX_UPDATER] Parameter: {parameter_name}")
+            print(f"[LDX_UPDATER] New value: {new_value}")
+            
+            before_stats = MotecLdxUpdater._get_file_stats(file_path, raw)
+            print(f"[LDX_UPDATER] BEFORE - Path: {before_stats.get('absolute_path')}")
+            print(f"[LDX_UPDATER] BEFORE - Exists: {before_stats.get('exists')}")
+            print(f"[LDX_UPDATER] BEFORE - Size: {before_stats.get('size')} bytes")
+            print(f"[LDX_UPDATER] BEFORE - mtime: {before_stats.get('mtime_str')}")
+            print(f"[LDX_UPDATER] BEFORE - Hash: {before_stats.get('hash')[:16]}...")
+            print(f"[LDX_UPDATER] BEFORE - Readable: {before_stats.get('readable')}, Writable: {before_stats.get('writable')}")
         
         try:
             if not file_path.exists():
@@ -82,12 +133,10 @@ class MotecLdxUpdater:
                 return False
             
             # Parse the XML
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            # Get original content hash for comparison
-            original_content = ET.tostring(root, encoding='unicode')
-            original_hash = hashlib.sha256(original_content.encode()).hexdigest()
+            if raw is None:
+                # Unreadable above - read again so the real error is reported
+                raw = file_path.read_bytes()
+            root = ET.fromstring(raw, XML_PARSER)
             
             # Determine parameter type and update accordingly
             if parameter_name.startswith("ldx_details_"):
@@ -126,105 +175,76 @@ class MotecLdxUpdater:
                 )
             
             if updated:
-                print(f"[LDX_UPDATER] Parameter found and XML updated")
+                if debug:
+                    print(f"[LDX_UPDATER] Parameter found and XML updated")
                 
                 # Create backup first
                 backup_path = file_path.with_suffix(file_path.suffix + '.bak')
                 if not backup_path.exists():
                     import shutil
                     shutil.copy2(file_path, backup_path)
-                    print(f"[LDX_UPDATER] Backup created: {backup_path}")
-                else:
+                    if debug:
+                        print(f"[LDX_UPDATER] Backup created: {backup_path}")
+                elif debug:
                     print(f"[LDX_UPDATER] Backup already exists: {backup_path}")
                 
                 # Format XML properly
                 try:
-                    ET.indent(tree, space=" ", level=0)
+                    ET.indent(root, space=" ", level=0)
                 except AttributeError:
                     # Python < 3.9 doesn't have ET.indent
                     pass
                 
-                # Generate new XML content
-                new_content = ET.tostring(root, encoding='unicode')
-                new_hash = hashlib.sha256(new_content.encode()).hexdigest()
-                
-                print(f"[LDX_UPDATER] Original content hash: {original_hash[:16]}...")
-                print(f"[LDX_UPDATER] New content hash: {new_hash[:16]}...")
+                # Serialize once - the same bytes are hashed for the debug log and written
+                xml_bytes = ET.tostring(root, encoding='utf-8', xml_declaration=True)
                 
-                if original_hash == new_hash:
-                    print(f"[LDX_UPDATER] WARNING: Content hash unchanged - no actual changes produced!")
-                    print(f"[LDX_UPDATER] This may mean the parameter was not found or value unchanged")
+                if debug:
+                    # Compare the file as read against the file about to be written
+                    original_hash = before_stats.get('hash')
+                    new_hash = hashlib.sha256(xml_bytes).hexdigest()
+                    
+                    print(f"[LDX_UPDATER] Original content hash: {original_hash[:16]}...")
+                    print(f"[LDX_UPDATER] New content hash: {new_hash[:16]}...")
+                    
+                    if original_hash == new_hash:
+                        print(f"[LDX_UPDATER] WARNING: Content hash unchanged - no actual changes produced!")
+                        print(f"[LDX_UPDATER] This may mean the parameter was not found or value unchanged")
                 
                 # Atomic write: Write to temporary file first, then replace
                 temp_path = file_path.with_suffix(file_path.suffix + '.tmp')
-                print(f"[LDX_UPDATER] Writing to temp file: {temp_path}")
                 
                 # Write XML with proper formatting
                 with open(temp_path, 'wb') as f:
-                    xml_bytes = ET.tostring(root, encoding='utf-8', xml_declaration=True)
                     f.write(xml_bytes)
-                    f.flush()
-                    os.fsync(f.fileno())  # Force write to disk
+                    if durable:
+                        f.flush()
+                        os.fsync(f.fileno())  # Force write to disk
                 
-                print(f"[LDX_UPDATER] Temp file written, size: {temp_path.stat().st_size} bytes")
+                if debug:
+                    print(f"[LDX_UPDATER] Temp file written: {temp_path}, size: {temp_path.stat().st_size} bytes")
                 
                 # Atomic replace
                 os.replace(temp_path, file_path)
-                print(f"[LDX_UPDATER] Atomic replace completed: {temp_path} -> {file_path}")
                 
-                # Verify AFTER write
-                time.sleep(0.1)  # Brief pause to ensure filesystem sync
-                after_stats = MotecLdxUpdater._get_file_stats(file_path)
-                print(f"[LDX_UPDATER] AFTER - Size: {after_stats.get('size')} bytes")
-                print(f"[LDX_UPDATER] AFTER - mtime: {after_stats.get('mtime_str')}")
-                print(f"[LDX_UPDATER] AFTER - Hash: {after_stats.get('hash')[:16]}...")
-                
-                # Verify the change is actually in the file
-                try:
-                    verify_tree = ET.parse(file_path)
-                    verify_root = verify_tree.getroot()
+                if debug:
+                    print(f"[LDX_UPDATER] Atomic replace completed: {temp_path} -> {file_path}")
                     
-                    # Check if our change is actually there
-                    if parameter_name.startswith("ldx_details_"):
-                        original_id = parameter_name.replace("ldx_details_", "").replace("_", " ")
-                        details = verify_root.find(".//Details")
-                        if details is not None:
-                            for string_elem in details.findall("String"):
-                                if string_elem.get("Id") == original_id:
-                                    actual_value = string_elem.get("Value", "")
-                                    print(f"[LDX_UPDATER] VERIFICATION - Found '{original_id}' in file with value: '{actual_value}'")
-                                    if actual_value == str(new_value):
-                                        print(f"[LDX_UPDATER] ✓ VERIFIED: Value matches expected new value")
-                                    else:
-                                        print(f"[LDX_UPDATER] ✗ MISMATCH: Expected '{new_value}', got '{actual_value}'")
-                    elif parameter_name.startswith("ldx_math_"):
-                        parts = parameter_name.replace("ldx_math_", "").split("_")
-                        if len(parts) >= 2:
-                            field = parts[-1]
-                            item_id = "_".join(parts[:-1])
-                            item_id_with_spaces = item_id.replace("_", " ")
-                            math_items = verify_root.find(".//MathItems")
-                            if math_items is not None:
-                                for math_item in math_items.findall("MathScaleOffset"):
-                                    ldx_id = math_item.get("Id", "")
-                                    if ldx_id == item_id or ldx_id == item_id_with_spaces:
-                                        if field in ["scale", "Scale"]:
-                                            actual_value = math_item.get("Scale", "")
-                                        else:
-                                            actual_value = math_item.get("Offset", "")
-                                        print(f"[LDX_UPDATER] VERIFICATION - Found '{item_id}' ({field}) with value: '{actual_value}'")
-                                        if actual_value == str(new_value):
-                                            print(f"[LDX_UPDATER] ✓ VERIFIED: Value matches expected new value")
-                                        else:
-                                            print(f"[LDX_UPDATER] ✗ MISMATCH: Expected '{new_value}', got '{actual_value}'")
-                except Exception as verify_err:
-                    print(f"[LDX_UPDATER] WARNING: Could not verify change: {verify_err}")
-                
-                print(f"[LDX_UPDATER] === UPDATE COMPLETE ===")
+                    # Verify AFTER write - os.replace is atomic, so the file must now hold exactly
+                    # xml_bytes (no settle delay or re-parse needed to check that)
+                    after_stats = MotecLdxUpdater._get_file_stats(file_path)
+                    print(f"[LDX_UPDATER] AFTER - Size: {after_stats.get('size')} bytes")
+                    print(f"[LDX_UPDATER] AFTER - mtime: {after_stats.get('mtime_str')}")
+                    print(f"[LDX_UPDATER] AFTER - Hash: {after_stats.get('hash')[:16]}...")
+                    
+                    if after_stats.get('hash') == hashlib.sha256(xml_bytes).hexdigest():
+                        print(f"[LDX_UPDATER] ✓ VERIFIED: File matches the written XML")
+                    else:
+                        print(f"[LDX_UPDATER] ✗ MISMATCH: File does not match the written XML")
+                    
+                    print(f"[LDX_UPDATER] === UPDATE COMPLETE ===")
                 return True
             else:
-                print(f"[LDX_UPDATER] Parameter not found in XML structure")
-                print(f"[LDX_UPDATER] === UPDATE FAILED (parameter not found) ===")
+                print(f"[LDX_UPDATER] Parameter not found in XML structure: {parameter_name}")
                 return False
             
         except Exception as e:
@@ -269,10 +289,10 @@ class MotecLdxUpdater:
             ldx_id = math_item.get("Id", "")
             # Match either format (spaces or underscores)
             if ldx_id == item_id or ldx_id == item_id_with_spaces:
-                if field in ["scale", "Scale"]:
+                if field in SCALE_FIELDS:
                     math_item.set("Scale", str(new_value))
                     return True
-                elif field in ["offset", "Offset"]:
+                elif field in OFFSET_FIELDS:
                     math_item.set("Offset", str(new_value))
                     return True
         
@@ -289,10 +309,10 @@ class MotecLdxUpdater:
         # Find the Descriptor element with matching Id
         for desc in descriptors.findall("Descriptor"):
             if desc.get("Id") == desc_id:
-                if field in ["dps", "DisplayDPS"]:
+                if field in DPS_FIELDS:
                     desc.set("DisplayDPS", str(new_value))
                     return True
-                elif field in ["unit", "DisplayUnit"]:
+                elif field in UNIT_FIELDS:
                     desc.set("DisplayUnit", str(new_value))
                     return True
         
@@ -319,7 +339,6 @@ class MotecLdxUpdater:
         """
         try:
             # Try to get car parameter definition to get display name
-            from .car_parameters import get_car_parameter_definition
             defn = get_car_parameter_definition(parameter_name)
             
             if defn:
@@ -368,13 +387,15 @@ class MotecLdxUpdater:
             if existing_string is not None:
                 # Update existing String
                 existing_string.set("Value", formatted_value)
-                print(f"[LDX_UPDATER] Updated Details documentation: '{details_id}' = '{formatted_value}'")
+                if settings.MOTEC_LDX_UPDATER_DEBUG:
+                    print(f"[LDX_UPDATER] Updated Details documentation: '{details_id}' = '{formatted_value}'")
             else:
                 # Create new String element
                 new_string = ET.SubElement(details, "String")
                 new_string.set("Id", details_id)
                 new_string.set("Value", formatted_value)
-                print(f"[LDX_UPDATER] Added Details documentation: '{details_id}' = '{formatted_value}'")
+                if settings.MOTEC_LDX_UPDATER_DEBUG:
+                    print(f"[LDX_UPDATER] Added Details documentation: '{details_id}' = '{formatted_value}'")
             
             return True
             
@@ -384,6 +405,32 @@ class MotecLdxUpdater:
             traceback.print_exc()
             return False
     
+    @staticmethod
+    def _get_ldx_ids(file_path: Path, stat: os.stat_result) -> Dict[str, frozenset]:
+        """Get the Details/MathItems/Descriptors Ids in an LDX file (cached until the file changes)"""
+        cache_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = _ldx_ids_cache.get(cache_key)
+        if cached is not None:
+            _ldx_ids_cache.move_to_end(cache_key)
+            return cached
+        
+        root = ET.parse(str(file_path), XML_PARSER).getroot()
+        
+        # Same sections the updaters search: the first Details/MathItems/Descriptors found
+        details = root.find(".//Details")
+        math_items = root.find(".//MathItems")
+        descriptors = root.find(".//Descriptors")
+        ids = {
+            "details": frozenset(e.get("Id") for e in details.findall("String")) if details is not None else frozenset(),
+            "math": frozenset(e.get("Id", "") for e in math_items.findall("MathScaleOffset")) if math_items is not None else frozenset(),
+            "descriptors": frozenset(e.get("Id", "") for e in descriptors.findall("Descriptor")) if descriptors is not None else frozenset()
+        }
+        
+        _ldx_ids_cache[cache_key] = ids
+        if len(_ldx_ids_cache) > LDX_IDS_CACHE_SIZE:
+            _ldx_ids_cache.popitem(last=False)
+        return ids
+    
     @staticmethod
     def ldx_file_contains_parameter(file_path: Path, parameter_name: str) -> bool:
         """
@@ -397,21 +444,19 @@ class MotecLdxUpdater:
             True if the file contains the parameter, False otherwise
         """
         try:
-            if not file_path.exists():
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
                 return False
             
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            ids = MotecLdxUpdater._get_ldx_ids(file_path, stat)
             
             # Check based on parameter type
             if parameter_name.startswith("ldx_details_"):
                 # Check Details section
                 original_id = parameter_name.replace("ldx_details_", "").replace("_", " ")
-                details = root.find(".//Details")
-                if details is not None:
-                    for string_elem in details.findall("String"):
-                        if string_elem.get("Id") == original_id:
-                            return True
+                if original_id in ids["details"]:
+                    return True
             
             elif parameter_name.startswith("ldx_math_"):
                 # Check MathItems section
@@ -419,13 +464,9 @@ class MotecLdxUpdater:
                 if len(parts) >= 2:
                     item_id = "_".join(parts[:-1])
                     item_id_with_spaces = item_id.replace("_", " ")
-                    math_items = root.find(".//MathItems")
-                    if math_items is not None:
-                        for math_item in math_items.findall("MathScaleOffset"):
-                            ldx_id = math_item.get("Id", "")
-                            # Match either format (spaces or underscores)
-                            if ldx_id == item_id or ldx_id == item_id_with_spaces:
-                                return True
+                    # Match either format (spaces or underscores)
+                    if item_id in ids["math"] or item_id_with_spaces in ids["math"]:
+                        return True
             
             elif parameter_name.startswith("ldx_desc_"):
                 # Check Descriptors section
@@ -433,19 +474,14 @@ class MotecLdxUpdater:
                 if len(parts) >= 2:
                     desc_id = "_".join(parts[:-1])
                     desc_id_with_spaces = desc_id.replace("_", " ")
-                    descriptors = root.find(".//Descriptors")
-                    if descriptors is not None:
-                        for desc in descriptors.findall("Descriptor"):
-                            ldx_id = desc.get("Id", "")
-                            # Match either format (spaces or underscores)
-                            if ldx_id == desc_id or ldx_id == desc_id_with_spaces:
-                                return True
+                    # Match either format (spaces or underscores)
+                    if desc_id in ids["descriptors"] or desc_id_with_spaces in ids["descriptors"]:
+                        return True
             
             else:
                 # For car parameters, we'll always try to document them
                 # Check if it's a car parameter
                 try:
-                    from .car_parameters import get_car_parameter_definition
                     defn = get_car_parameter_definition(parameter_name)
                     if defn:
                         # This is a car parameter that should be documented
@@ -2,14 +2,43 @@
 MoTeC File Parser - Comprehensive parser for .ldx and .ld files
 Handles XML-based LDX files and binary LD files
 """
+import copy
+import os
 import struct
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-import xml.etree.ElementTree as ET
 from .config.settings import settings
 
+# Prefer lxml (libxml2, C-speed parsing) when installed; the stdlib parser has the same iterparse API
+try:
+    from lxml import etree as ET
+    # Uploaded files must not expand entities or fetch DTDs (XXE) - the stdlib parser never does either
+    ITERPARSE_OPTIONS = {"resolve_entities": False, "no_network": True}
+except ImportError:
+    import xml.etree.ElementTree as ET  # lxml not installed, use the standard library
+    ITERPARSE_OPTIONS = {}
+
+# Date/time patterns for LD header strings: DD/MM/YYYY HH:MM:SS
+DATE_REGEX = re.compile(r'(\d{2}/\d{2}/\d{4})')
+TIME_REGEX = re.compile(r'(\d{2}:\d{2}:\d{2})')
+# Runs of printable ASCII (0x20-0x7E) in LD headers, at the default minimum length of 3
+PRINTABLE_RUN_REGEX = re.compile(rb'[\x20-\x7e]{3,}')
+# Substrings that mark LD header strings as a device name, or rule them out as a driver name
+DEVICE_MARKERS = ('SCR', 'M1', 'M150', 'GPRP', 'PDM')
+NON_DRIVER_MARKERS = ('SCR', 'M1', 'GPRP', 'PDM', 'GPS')
+TRACK_MARKERS = ('Track', 'Raceway', 'Speedway', 'Circuit', 'Pomona')
+
+# LRU of parse results keyed by (path, mtime_ns, size, inode) - files are re-read far more often than rewritten.
+# The inode catches os.replace rewrites (e.g. LDX updates) that keep size and land in the same mtime tick.
+PARSE_CACHE_SIZE = 128
+_parse_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+# Uploads are parsed on worker threads - lookups and inserts/evictions must not interleave
+_parse_cache_lock = threading.Lock()
+
 
 class MotecLdxParser:
     """Parser for MoTeC LDX (XML-based workspace) files"""
@@ -18,67 +47,81 @@ class MotecLdxParser:
     def parse(file_path: Path) -> Dict[str, Any]:
         """Parse an LDX file and extract all available information"""
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
             result = {
                 "file_type": "ldx",
                 "filename": file_path.name,
                 "file_size": file_path.stat().st_size,
                 "parsed_at": datetime.now().isoformat(),
-                "version": root.get("Version", ""),
-                "locale": root.get("Locale", ""),
-                "default_locale": root.get("DefaultLocale", ""),
             }
             
-            # Parse Details section
-            details = root.find(".//Details")
-            if details is not None:
-                result["details"] = {}
-                for string_elem in details.findall("String"):
-                    key = string_elem.get("Id", "")
-                    value = string_elem.get("Value", "")
-                    if key:
-                        result["details"][key] = value
+            # Single streaming pass (instead of a full tree plus one .// search per section).
+            # The root itself is excluded, matching the previous .// searches.
+            depth = 0
+            details_elem = None
+            marker_groups = []
+            total_markers = 0
+            layer_count = 0
+            has_range_block = False
             
-            # Parse MarkerGroups and Markers
-            marker_groups = root.findall(".//MarkerGroup")
-            if marker_groups:
-                result["marker_groups"] = []
-                total_markers = 0
-                for mg in marker_groups:
-                    group_name = mg.get("Name", "")
-                    group_index = mg.get("Index", "")
+            for event, elem in ET.iterparse(str(file_path), events=("start", "end"), **ITERPARSE_OPTIONS):
+                if event == "start":
+                    if depth == 0:
+                        result["version"] = elem.get("Version", "")
+                        result["locale"] = elem.get("Locale", "")
+                        result["default_locale"] = elem.get("DefaultLocale", "")
+                    else:
+                        tag = elem.tag
+                        if tag == "Details" and details_elem is None:
+                            details_elem = elem
+                        elif tag == "Layer":
+                            layer_count += 1
+                        elif tag == "RangeBlock":
+                            has_range_block = True
+                    depth += 1
+                    continue
+                
+                depth -= 1
+                if depth == 0:
+                    continue
+                
+                if elem is details_elem:
+                    # Parse Details section
+                    result["details"] = {}
+                    for string_elem in elem.findall("String"):
+                        key = string_elem.get("Id", "")
+                        value = string_elem.get("Value", "")
+                        if key:
+                            result["details"][key] = value
+                
+                elif elem.tag == "MarkerGroup":
+                    # Parse MarkerGroups and Markers
                     markers = []
-                    
-                    for marker in mg.findall("Marker"):
-                        marker_data = {
+                    for marker in elem.findall("Marker"):
+                        markers.append({
                             "name": marker.get("Name", ""),
                             "version": marker.get("Version", ""),
                             "class_name": marker.get("ClassName", ""),
                             "flags": marker.get("Flags", ""),
                             "time": marker.get("Time", ""),
-                        }
-                        markers.append(marker_data)
-                        total_markers += 1
-                    
-                    result["marker_groups"].append({
-                        "name": group_name,
-                        "index": group_index,
+                        })
+                    total_markers += len(markers)
+                    marker_groups.append({
+                        "name": elem.get("Name", ""),
+                        "index": elem.get("Index", ""),
                         "marker_count": len(markers),
                         "markers": markers
                     })
-                
+                    # Markers are copied out - release the subtree
+                    elem.clear()
+            
+            if marker_groups:
+                result["marker_groups"] = marker_groups
                 result["total_markers"] = total_markers
             
-            # Parse Layers
-            layers = root.findall(".//Layer")
-            if layers:
-                result["layer_count"] = len(layers)
+            if layer_count:
+                result["layer_count"] = layer_count
             
-            # Parse RangeBlock if present
-            range_blocks = root.findall(".//RangeBlock")
-            if range_blocks:
+            if has_range_block:
                 result["has_range_block"] = True
             
             return result
@@ -100,38 +143,20 @@ class MotecLdParser:
     @staticmethod
     def _extract_strings(data: bytes, min_length: int = 3) -> List[str]:
         """Extract readable strings from binary data"""
-        strings = []
-        current_string = b""
-        
-        for byte in data:
-            if 32 <= byte <= 126:  # Printable ASCII
-                current_string += bytes([byte])
-            else:
-                if len(current_string) >= min_length:
-                    try:
-                        strings.append(current_string.decode('utf-8', errors='ignore').strip())
-                    except:
-                        pass
-                current_string = b""
-        
-        # Add final string
-        if len(current_string) >= min_length:
-            try:
-                strings.append(current_string.decode('utf-8', errors='ignore').strip())
-            except:
-                pass
+        # Let the regex engine find the printable runs instead of growing bytes one byte at a time
+        if min_length == 3:
+            pattern = PRINTABLE_RUN_REGEX
+        else:
+            pattern = re.compile(rb'[\x20-\x7e]{%d,}' % min_length)
         
-        return strings
+        # Runs are pure ASCII, so decoding can't fail
+        return [match.group().decode('ascii').strip() for match in pattern.finditer(data)]
     
     @staticmethod
     def _parse_date_time(text: str) -> Optional[Dict[str, str]]:
         """Try to extract date and time from text"""
-        # Pattern: DD/MM/YYYY HH:MM:SS
-        date_pattern = r'(\d{2}/\d{2}/\d{4})'
-        time_pattern = r'(\d{2}:\d{2}:\d{2})'
-        
-        date_match = re.search(date_pattern, text)
-        time_match = re.search(time_pattern, text)
+        date_match = DATE_REGEX.search(text)
+        time_match = TIME_REGEX.search(text)
         
         result = {}
         if date_match:
@@ -146,38 +171,34 @@ class MotecLdParser:
         """Extract session information from extracted strings"""
         info = {}
         
-        # Common patterns
-        date_pattern = re.compile(r'\d{2}/\d{2}/\d{4}')
-        time_pattern = re.compile(r'\d{2}:\d{2}:\d{2}')
-        
         for s in strings:
+            # Search/uppercase each string once and reuse the results for every check below
+            date_match = DATE_REGEX.search(s)
+            time_match = TIME_REGEX.search(s)
+            s_upper = s.upper()
+            
             # Look for date
-            if date_pattern.search(s) and "date" not in info:
-                date_match = date_pattern.search(s)
-                if date_match:
-                    info["date"] = date_match.group()
+            if date_match and "date" not in info:
+                info["date"] = date_match.group()
             
             # Look for time
-            if time_pattern.search(s) and "time" not in info:
-                time_match = time_pattern.search(s)
-                if time_match:
-                    info["time"] = time_match.group()
+            if time_match and "time" not in info:
+                info["time"] = time_match.group()
             
             # Look for device/model names (common MoTeC patterns)
-            if any(x in s.upper() for x in ['SCR', 'M1', 'M150', 'GPRP', 'PDM']):
+            if any(x in s_upper for x in DEVICE_MARKERS):
                 if "device_name" not in info:
                     info["device_name"] = s
             
             # Look for track names (common patterns)
-            if any(x in s for x in ['Track', 'Raceway', 'Speedway', 'Circuit', 'Pomona']):
+            if any(x in s for x in TRACK_MARKERS):
                 if "track_name" not in info:
                     info["track_name"] = s
             
             # Look for driver names (usually short strings without special chars)
             if len(s) > 2 and len(s) < 30 and s.replace(' ', '').isalnum():
                 # Skip dates, times, and device names
-                if not (date_pattern.search(s) or time_pattern.search(s) or 
-                       any(x in s.upper() for x in ['SCR', 'M1', 'GPRP', 'PDM', 'GPS'])):
+                if not (date_match or time_match or any(x in s_upper for x in NON_DRIVER_MARKERS)):
                     if "driver_name" not in info or len(s) > len(info.get("driver_name", "")):
                         info["driver_name"] = s
         
@@ -198,37 +219,37 @@ class MotecLdParser:
             # Use configured header size
             ld_header_size = header_size or settings.MOTEC_LD_HEADER_SIZE
             
-            with open(file_path, 'rb') as f:
-                # Read header section
-                header = f.read(ld_header_size)
-                
-                # Extract all readable strings from header
-                strings = MotecLdParser._extract_strings(header, min_length=3)
-                
-                # Extract session information
-                session_info = MotecLdParser._extract_session_info(strings)
-                result.update(session_info)
-                
-                # Store raw strings for reference (limited to avoid huge output)
-                result["extracted_strings"] = strings[:50]  # Limit to first 50 strings
-                
-                # Try to parse structured header (if we know the format)
-                # MoTeC LD files typically have:
-                # - File signature/version at offset 0
-                # - Metadata strings at various offsets
-                # - Channel definitions after header
-                
-                # Read first few bytes as potential file signature
-                f.seek(0)
-                signature = f.read(4)
-                if len(signature) >= 4:
-                    # Try to interpret as integers
-                    try:
-                        # Could be version info or file type marker
-                        vals = struct.unpack('<4B', signature)
-                        result["header_signature"] = [hex(v) for v in vals]
-                    except:
-                        pass
+            # Read header section with one unbuffered read() - no readahead buffer fill and
+            # no mapping of the whole file. At least 4 bytes so the signature below is always available
+            with open(file_path, 'rb', buffering=0) as f:
+                data = f.read(max(ld_header_size, 4))
+            header = data[:ld_header_size]
+            
+            # Extract all readable strings from header
+            strings = MotecLdParser._extract_strings(header, min_length=3)
+            
+            # Extract session information
+            session_info = MotecLdParser._extract_session_info(strings)
+            result.update(session_info)
+            
+            # Store raw strings for reference (limited to avoid huge output)
+            result["extracted_strings"] = strings[:50]  # Limit to first 50 strings
+            
+            # Try to parse structured header (if we know the format)
+            # MoTeC LD files typically have:
+            # - File signature/version at offset 0
+            # - Metadata strings at various offsets
+            # - Channel definitions after header
+            
+            # First few bytes as potential file signature
+            if len(data) >= 4:
+                # Try to interpret as integers
+                try:
+                    # Could be version info or file type marker
+                    vals = struct.unpack_from('<4B', data, 0)
+                    result["header_signature"] = [hex(v) for v in vals]
+                except:
+                    pass
             
             return result
             
@@ -249,22 +270,54 @@ class MotecParser:
     @staticmethod
     def parse_file(file_path: Path) -> Dict[str, Any]:
         """Parse a MoTeC file (.ldx or .ld)"""
+        # Callers get their own copy, so they can't corrupt the cached result
+        return copy.deepcopy(MotecParser._parse_file_shared(file_path))
+    
+    @staticmethod
+    def _parse_file_shared(file_path: Path) -> Dict[str, Any]:
+        """Parse a MoTeC file, returning the cached result itself (read-only - don't mutate it)"""
         file_path = Path(file_path)
         
-        if not file_path.exists():
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        if file_path.suffix.lower() == settings.MOTEC_LDX_EXTENSION.lower():
-            return MotecLdxParser.parse(file_path)
-        elif file_path.suffix.lower() == settings.MOTEC_LD_EXTENSION.lower():
-            return MotecLdParser.parse(file_path)
+        suffix = file_path.suffix.lower()
+        if suffix == settings.MOTEC_LDX_EXTENSION.lower():
+            parser = MotecLdxParser
+        elif suffix == settings.MOTEC_LD_EXTENSION.lower():
+            parser = MotecLdParser
         else:
             raise ValueError(f"Unsupported file type: {file_path.suffix}")
+        
+        # In-place rewrites change mtime/size and atomic replaces change the inode,
+        # so a hit is always the current content
+        cache_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with _parse_cache_lock:
+            cached = _parse_cache.get(cache_key)
+            if cached is not None:
+                _parse_cache.move_to_end(cache_key)
+                return cached
+        
+        # Parse outside the lock so other files aren't held up behind this one
+        result = parser.parse(file_path)
+        
+        # Don't cache failures - the file may still be being written
+        if "parse_error" not in result:
+            with _parse_cache_lock:
+                _parse_cache[cache_key] = result
+                if len(_parse_cache) > PARSE_CACHE_SIZE:
+                    _parse_cache.popitem(last=False)
+        
+        return result
     
     @staticmethod
     def parse_metadata(file_path: Path) -> Dict[str, Any]:
         """Parse file and return simplified metadata for storage"""
-        full_parse = MotecParser.parse_file(file_path)
+        # Only scalar fields are copied out below, so the shared cached result is safe to read
+        # (avoids deep-copying every marker group just to count them)
+        full_parse = MotecParser._parse_file_shared(file_path)
         
         # Extract key metadata fields
         metadata = {
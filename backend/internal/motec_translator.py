@@ -3,6 +3,7 @@ MoTeC Translator - Bidirectional translation between .ldx files and Admin Consol
 Converts LDX XML data to parameter format and vice versa
 """
 import xml.etree.ElementTree as ET
+import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List, Optional
@@ -78,14 +79,23 @@ class MotecTranslator:
                         "_original_id": key
                     })
             
-            # Extract MathItems if available (need to parse XML directly for now)
+            # Collect MathItems and Descriptors in one walk over one parse
+            math_items = []
+            descriptors = []
+            try:
+                root = ET.parse(file_path).getroot()
+                for elem in root.iter():
+                    if elem.tag == "MathItems":
+                        math_items.extend(elem.findall("MathScaleOffset"))
+                    elif elem.tag == "Descriptors":
+                        descriptors.extend(elem.findall("Descriptor"))
+            except Exception:
+                # Both sections are optional
+                pass
+            
+            # Extract MathItems if available
             if include_math_items:
                 try:
-                    tree = ET.parse(file_path)
-                    root = tree.getroot()
-                    
-                    # Find MathItems
-                    math_items = root.findall(".//MathItems/MathScaleOffset")
                     for math_item in math_items:
                         item_id = math_item.get("Id", "")
                         if not item_id:
@@ -128,10 +138,6 @@ class MotecTranslator:
             
             # Extract Descriptors if available
             try:
-                tree = ET.parse(file_path)
-                root = tree.getroot()
-                
-                descriptors = root.findall(".//Descriptors/Descriptor")
                 for desc in descriptors:
                     desc_id = desc.get("Id", "")
                     if not desc_id:
@@ -170,7 +176,8 @@ class MotecTranslator:
         default_locale: str = "C",
         version: str = "1.6",
         preserve_markers: bool = False,
-        marker_groups: Optional[List[Dict[str, Any]]] = None
+        marker_groups: Optional[List[Dict[str, Any]]] = None,
+        pretty: bool = False
     ) -> Path:
         """
         Convert parameters from admin console to LDX file
@@ -183,6 +190,7 @@ class MotecTranslator:
             version: LDX version
             preserve_markers: If True, preserve markers from template LDX
             marker_groups: Optional marker groups to include
+            pretty: If True, indent the XML for human reading (extra pass over the tree)
         
         Returns:
             Path to created LDX file
@@ -304,23 +312,22 @@ class MotecTranslator:
                 desc.set("DisplayColorIndex", "2")
                 desc.set("Interpolate", "1")
         
-        # Create XML tree and write to file
-        tree = ET.ElementTree(root)
+        # Indent XML only when asked - MoTeC doesn't need it and it is a full extra tree pass
+        if pretty:
+            ET.indent(root, space=" ", level=0)
         
-        # Indent XML (ET.indent available in Python 3.9+)
-        try:
-            ET.indent(tree, space=" ", level=0)
-        except AttributeError:
-            # Python < 3.9 doesn't have ET.indent, use manual formatting
-            pass
+        # Serialize once with XML declaration
+        xml_bytes = ET.tostring(root, encoding="utf-8", xml_declaration=True)
         
-        # Write with XML declaration
+        # Single write to a temp file then atomic replace, so an
+        # interrupted export never leaves a half-written LDX at output_path
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        tree.write(
-            output_path,
-            encoding="utf-8",
-            xml_declaration=True
-        )
+        temp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+        with open(temp_path, 'wb', buffering=65536) as f:
+            f.write(xml_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
         
         return output_path
     
@@ -2,7 +2,7 @@
 Manage parameter defaults in JSON file
 Similar to registered_users.json - stores default parameter values and metadata
 """
-import json
+import orjson
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -15,25 +15,23 @@ def ensure_parameter_defaults_file():
     """Ensure the parameter defaults file exists"""
     PARAMETER_DEFAULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not PARAMETER_DEFAULTS_FILE.exists():
-        with open(PARAMETER_DEFAULTS_FILE, 'w') as f:
-            json.dump([], f)
+        PARAMETER_DEFAULTS_FILE.write_bytes(b"[]")
 
 
 def load_parameter_defaults() -> List[Dict[str, Any]]:
     """Load all parameter defaults from JSON file"""
     ensure_parameter_defaults_file()
     try:
-        with open(PARAMETER_DEFAULTS_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
+        return orjson.loads(PARAMETER_DEFAULTS_FILE.read_bytes())
+    except (orjson.JSONDecodeError, FileNotFoundError):
         return []
 
 
 def save_parameter_defaults(defaults: List[Dict[str, Any]]):
     """Save parameter defaults to JSON file"""
     ensure_parameter_defaults_file()
-    with open(PARAMETER_DEFAULTS_FILE, 'w') as f:
-        json.dump(defaults, f, indent=2, default=str)
+    # Metadata is caller-supplied, so allow non-string keys like json.dump did
+    PARAMETER_DEFAULTS_FILE.write_bytes(orjson.dumps(defaults, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
 
 def get_parameter_default(parameter_name: str) -> Optional[Dict[str, Any]]:
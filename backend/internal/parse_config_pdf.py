@@ -10,6 +10,29 @@ BASE_DIR = Path(__file__).parent.parent.parent
 PDF_PATH = BASE_DIR / "Config Variables - Sheet1.pdf"
 OUTPUT_PATH = BASE_DIR / "data" / "car_parameters.json"
 
+# Lookup tables applied to every PDF line, built once
+SUBTEAMS = ('Suspension', 'Powertrain', 'Ergo', 'DAQ', 'Aero', 'Egro')
+TABS = ('Damper', 'CCT', 'Parameters', 'Temp', 'Tires', 'sound', 'Brake', 'Rear', 'Front', 'Special', 'Rear')
+TYPE_PATTERNS = tuple((re.compile(pattern, re.IGNORECASE), dtype) for pattern, dtype in (
+    (r'\bInt\b', 'int'),
+    (r'\bfloat\b', 'float'),
+    (r'\bFoat\?', 'float'),  # typo in PDF
+    (r'\bString\b', 'string'),
+    (r'\bstring\b', 'string'),
+    (r'drop down', 'dropdown'),
+))
+UNIT_PATTERNS = tuple((re.compile(pattern, re.IGNORECASE), u) for pattern, u in (
+    (r'\bDegrees?\b', 'deg'),
+    (r'\blbs?\b', 'lbs'),
+    (r'\bPSI\b', 'psi'),
+    (r'\bdBc?\b', 'dB'),
+    (r'%\b', '%'),
+    (r'\bin\b(?!\w)', 'in'),  # 'in' but not 'inside' or 'constant'
+))
+DESCRIPTION_UNIT_WORD_REGEXES = tuple(
+    re.compile(rf'\b{u_word}\b', re.IGNORECASE) for u_word in ('Degrees', 'degrees', 'lbs', 'PSI', 'psi', 'dB', 'in')
+)
+
 def parse_pdf():
     """Parse PDF and extract all config variables"""
     with open(PDF_PATH, 'rb') as file:
@@ -32,9 +55,8 @@ def parse_pdf():
         # Example: "Suspension CCT FL Toe Foat? expected value of -5 to 5 Constant Degrees"
         
         # Find subteam (first word that's one of these)
-        subteams = ['Suspension', 'Powertrain', 'Ergo', 'DAQ', 'Aero', 'Egro']
         subteam = None
-        for st in subteams:
+        for st in SUBTEAMS:
             if line.startswith(st):
                 subteam = st
                 line = line[len(st):].strip()
@@ -44,9 +66,8 @@ def parse_pdf():
             continue
         
         # Find tab/category (next word before variable name starts)
-        tabs = ['Damper', 'CCT', 'Parameters', 'Temp', 'Tires', 'sound', 'Brake', 'Rear', 'Front', 'Special', 'Rear']
         tab = None
-        for t in tabs:
+        for t in TABS:
             if line.startswith(t):
                 tab = t
                 line = line[len(t):].strip()
@@ -55,17 +76,8 @@ def parse_pdf():
         # Now extract variable name, type, and description
         # Look for type indicators
         var_type = None
-        type_patterns = [
-            (r'\bInt\b', 'int'),
-            (r'\bfloat\b', 'float'),
-            (r'\bFoat\?', 'float'),  # typo in PDF
-            (r'\bString\b', 'string'),
-            (r'\bstring\b', 'string'),
-            (r'drop down', 'dropdown'),
-        ]
-        
-        for pattern, dtype in type_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
+        for pattern, dtype in TYPE_PATTERNS:
+            if pattern.search(line):
                 var_type = dtype
                 break
         
@@ -80,17 +92,8 @@ def parse_pdf():
         
         # Extract unit
         unit = ""
-        unit_patterns = [
-            (r'\bDegrees?\b', 'deg'),
-            (r'\blbs?\b', 'lbs'),
-            (r'\bPSI\b', 'psi'),
-            (r'\bdBc?\b', 'dB'),
-            (r'%\b', '%'),
-            (r'\bin\b(?!\w)', 'in'),  # 'in' but not 'inside' or 'constant'
-        ]
-        
-        for pattern, u in unit_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
+        for pattern, u in UNIT_PATTERNS:
+            if pattern.search(line):
                 unit = u
                 break
         
@@ -128,8 +131,8 @@ def parse_pdf():
             # Clean up description
             desc_part = desc_part.strip()
             # Remove unit mentions
-            for u_word in ['Degrees', 'degrees', 'lbs', 'PSI', 'psi', 'dB', 'in']:
-                desc_part = re.sub(rf'\b{u_word}\b', '', desc_part, flags=re.IGNORECASE)
+            for u_word_regex in DESCRIPTION_UNIT_WORD_REGEXES:
+                desc_part = u_word_regex.sub('', desc_part)
             # Remove range info
             desc_part = re.sub(r'expected value of.*?Constant', '', desc_part, flags=re.IGNORECASE)
             desc_part = re.sub(r'-?\d+\s+to\s+-?\d+', '', desc_part)
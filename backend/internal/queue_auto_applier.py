@@ -5,7 +5,7 @@ When a car returns and data is pulled, this module injects all pending queue ite
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from .database import get_queue, process_queue_item, get_parameter, update_parameter
+from .database import get_queue, process_queue_item, update_parameter
 from .motec_ldx_updater import MotecLdxUpdater
 from .config.settings import settings
 
@@ -73,43 +73,25 @@ async def auto_apply_queued_changes_to_file(
             )
             
             if success:
-                # Update parameter in database
-                # Check if parameter exists
-                existing = await get_parameter(parameter_name)
-                
-                if existing:
-                    # Update existing parameter
-                    await update_parameter(
-                        parameter_name=parameter_name,
-                        subteam=item["subteam"],
-                        new_value=new_value,
-                        updated_by=item["submitted_by"],
-                        comment=comment or f"Auto-applied from queue (queued by {item['submitted_by']})",
-                        form_id=form_id
-                    )
-                else:
-                    # Create new parameter
-                    await update_parameter(
-                        parameter_name=parameter_name,
-                        subteam=item["subteam"],
-                        new_value=new_value,
-                        updated_by=item["submitted_by"],
-                        comment=comment or f"Auto-applied from queue (queued by {item['submitted_by']})",
-                        form_id=form_id
-                    )
+                # Update parameter in database (update_parameter upserts, so new parameters are created too)
+                await update_parameter(
+                    parameter_name=parameter_name,
+                    subteam=item["subteam"],
+                    new_value=new_value,
+                    updated_by=item["submitted_by"],
+                    comment=comment or f"Auto-applied from queue (queued by {item['submitted_by']})",
+                    form_id=form_id
+                )
                 
                 # Mark queue item as auto-applied (using process_queue_item with special status)
                 # We'll update the status directly to "auto-applied"
-                from .database import get_db
-                db = await get_db()
-                try:
+                from .database import get_writer
+                async with get_writer() as db:
                     await db.execute(
                         f"UPDATE parameter_queue SET status = '{settings.QUEUE_STATUS_AUTO_APPLIED}' WHERE form_id = ?",
                         (form_id,)
                     )
                     await db.commit()
-                finally:
-                    await db.close()
                 
                 applied_items.append({
                     "form_id": form_id,
@@ -2,7 +2,7 @@
 Manage registered users in JSON file
 This file tracks ALL users (active and deleted) for easy reference
 """
-import json
+import orjson
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -17,25 +17,22 @@ def ensure_registered_users_file():
     """Ensure the registered users file exists"""
     REGISTERED_USERS_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not REGISTERED_USERS_FILE.exists():
-        with open(REGISTERED_USERS_FILE, 'w') as f:
-            json.dump([], f)
+        REGISTERED_USERS_FILE.write_bytes(b"[]")
 
 
 def load_registered_users() -> List[Dict[str, Any]]:
     """Load all registered users from JSON file"""
     ensure_registered_users_file()
     try:
-        with open(REGISTERED_USERS_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
+        return orjson.loads(REGISTERED_USERS_FILE.read_bytes())
+    except (orjson.JSONDecodeError, FileNotFoundError):
         return []
 
 
 def save_registered_users(users: List[Dict[str, Any]]):
     """Save registered users to JSON file"""
     ensure_registered_users_file()
-    with open(REGISTERED_USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2, default=str)
+    REGISTERED_USERS_FILE.write_bytes(orjson.dumps(users, default=str, option=orjson.OPT_INDENT_2))
 
 
 async def sync_registered_users_from_db():
@@ -49,6 +46,11 @@ async def sync_registered_users_from_db():
         cursor = await db.execute("SELECT id, username, role, created_at FROM users ORDER BY username ASC")
         db_users = await cursor.fetchall()
         
+        # Load existing once to get passwords (first entry per username wins)
+        existing_by_username = {}
+        for u in load_registered_users():
+            existing_by_username.setdefault(u.get("username"), u)
+        
         # Only keep active users (those in database)
         registered_users = []
         
@@ -56,10 +58,7 @@ async def sync_registered_users_from_db():
         for row in db_users:
             user_data = dict(row)
             username = user_data["username"]
-            
-            # Load existing to get password if it exists
-            existing = load_registered_users()
-            existing_user = next((u for u in existing if u.get("username") == username), None)
+            existing_user = existing_by_username.get(username)
             
             user_entry = {
                 "username": username,
@@ -2,7 +2,7 @@
 Session Tracker - Links uploaded MoTeC files to parameter snapshots
 Tracks which parameters were active during each session for performance analysis
 """
-import json
+import orjson
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -15,25 +15,23 @@ def ensure_sessions_file():
     """Ensure the sessions file exists"""
     SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not SESSIONS_FILE.exists():
-        with open(SESSIONS_FILE, 'w') as f:
-            json.dump([], f)
+        SESSIONS_FILE.write_bytes(b"[]")
 
 
 def load_sessions() -> List[Dict[str, Any]]:
     """Load all sessions from JSON file"""
     ensure_sessions_file()
     try:
-        with open(SESSIONS_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
+        # One binary read of the whole file, parsed by orjson (no text decoding pass)
+        return orjson.loads(SESSIONS_FILE.read_bytes())
+    except (orjson.JSONDecodeError, FileNotFoundError):
         return []
 
 
 def save_sessions(sessions: List[Dict[str, Any]]):
     """Save sessions to JSON file"""
     ensure_sessions_file()
-    with open(SESSIONS_FILE, 'w') as f:
-        json.dump(sessions, f, indent=2, default=str)
+    SESSIONS_FILE.write_bytes(orjson.dumps(sessions, default=str, option=orjson.OPT_INDENT_2))
 
 
 def create_session_from_file(
@@ -57,13 +55,14 @@ def create_session_from_file(
         Session record dictionary
     """
     sessions = load_sessions()
+    now = datetime.now()  # one clock read so session_id and uploaded_at agree
     
     session = {
-        "session_id": f"{datetime.now().timestamp()}_{filename}",
+        "session_id": f"{now.timestamp()}_{filename}",
         "file_id": file_id,
         "filename": filename,
         "file_type": file_type,
-        "uploaded_at": datetime.now().isoformat(),
+        "uploaded_at": now.isoformat(),
         "parameters_snapshot": parameters_snapshot,  # What parameters were active
         "session_data": session_data or {},  # Performance data from file
         "car_id": None  # Will be set by caller if car is identified
@@ -121,26 +120,28 @@ def compare_sessions(session_ids: List[str]) -> Dict[str, Any]:
     if len(selected_sessions) < 2:
         return {"error": "Need at least 2 sessions to compare"}
     
-    # Extract all unique parameter names
+    # Index each snapshot by parameter name once (first entry wins, as before)
+    snapshot_maps = []
     all_param_names = set()
     for session in selected_sessions:
+        snapshot = {}
         for param in session.get("parameters_snapshot", []):
-            all_param_names.add(param["parameter_name"])
+            snapshot.setdefault(param["parameter_name"], param["current_value"])
+        snapshot_maps.append(snapshot)
+        all_param_names.update(snapshot)
     
     # Compare parameter values
     parameter_comparison = {}
     for param_name in all_param_names:
-        values = []
-        for session in selected_sessions:
-            for param in session.get("parameters_snapshot", []):
-                if param["parameter_name"] == param_name:
-                    values.append({
-                        "session_id": session["session_id"],
-                        "filename": session["filename"],
-                        "value": param["current_value"]
-                    })
-                    break
-        parameter_comparison[param_name] = values
+        parameter_comparison[param_name] = [
+            {
+                "session_id": session["session_id"],
+                "filename": session["filename"],
+                "value": snapshot[param_name]
+            }
+            for session, snapshot in zip(selected_sessions, snapshot_maps)
+            if param_name in snapshot
+        ]
     
     # Extract performance data for comparison
     performance_comparison = {}
@@ -6,10 +6,11 @@ Optimized for Raspberry Pi
 from fastapi import FastAPI, Request, Query, HTTPException, Form, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import aiosqlite
+import asyncio
 from pathlib import Path
 from typing import Optional, List
 from datetime import datetime
@@ -32,7 +33,8 @@ from internal.database import (
     get_queue,
     process_queue_item,
     reject_queue_item,
-    reset_database
+    reset_database,
+    close_db
 )
 from internal.deleted_users import (
     add_deleted_user,
@@ -51,7 +53,8 @@ from internal.motec_file_manager import (
     get_all_files,
     get_file_by_id,
     delete_file as delete_motec_file,
-    get_file_path
+    get_file_path,
+    get_file_path_from_metadata
 )
 from internal.motec_parser import MotecParser
 from internal.motec_translator import MotecTranslator
@@ -88,7 +91,12 @@ from internal.auth import (
     require_role
 )
 
-app = FastAPI(title="USC Racing Parameter Management", version="2.0.0")
+# JSON routes (queue, history, parameter lists) are encoded with orjson
+app = FastAPI(
+    title="USC Racing Parameter Management",
+    version="2.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # CORS middleware (add first)
 app.add_middleware(
@@ -134,6 +142,12 @@ async def startup_event():
         traceback.print_exc()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled database connections on shutdown"""
+    await close_db()
+
+
 # Authentication routes
 @app.get("/test")
 async def test():
@@ -439,6 +453,14 @@ async def update_parameter_in_ldx_files(
     try:
         file_ids_to_update = set()
         
+        # Load file metadata once and index it by ID (first entry wins, like get_file_by_id)
+        # instead of re-reading and scanning the metadata file for every candidate file
+        from internal.motec_file_manager import get_all_files
+        all_files = get_all_files()
+        files_by_id = {}
+        for file_meta in all_files:
+            files_by_id.setdefault(file_meta.get("id"), file_meta)
+        
         # Method 1: Find files from sessions that contain this parameter
         from internal.session_tracker import get_all_sessions
         sessions = get_all_sessions()
@@ -459,9 +481,6 @@ async def update_parameter_in_ldx_files(
         #   - car parameters (should be auto-documented in Details)
         if parameter_name.startswith("ldx_"):
             # For ldx_ parameters, check if file contains this specific parameter
-            from internal.motec_file_manager import get_all_files
-            all_files = get_all_files()
-            
             # Parse each LDX file to see if it contains this parameter
             print(f"[DEBUG] Checking {len(all_files)} uploaded files for parameter '{parameter_name}'")
             for file_meta in all_files:
@@ -473,7 +492,7 @@ async def update_parameter_in_ldx_files(
                     continue
                 
                 # Check if file contains this parameter by parsing it
-                file_path = get_file_path(file_id)
+                file_path = get_file_path_from_metadata(files_by_id.get(file_id))
                 if file_path and file_path.exists():
                     contains_param = MotecLdxUpdater.ldx_file_contains_parameter(file_path, parameter_name)
                     if contains_param:
@@ -489,14 +508,12 @@ async def update_parameter_in_ldx_files(
         
         elif not parameter_name.startswith("ld_"):
             # For car parameters (not ldx_ or ld_), auto-document in ALL LDX files
-            from internal.motec_file_manager import get_all_files
             from internal.car_parameters import get_car_parameter_definition
             
             # Check if this is a car parameter that should be documented
             car_def = get_car_parameter_definition(parameter_name)
             if car_def:
                 print(f"[DEBUG] Car parameter '{parameter_name}' will be auto-documented in all LDX files")
-                all_files = get_all_files()
                 
                 # Add ALL LDX files for car parameter documentation
                 for file_meta in all_files:
@@ -513,10 +530,10 @@ async def update_parameter_in_ldx_files(
         # Update each LDX file
         print(f"[PARAM_UPDATE] Processing {len(file_ids_to_update)} file(s) for parameter '{parameter_name}'")
         for file_id in file_ids_to_update:
-            file_path = get_file_path(file_id)
+            # Already absolute (BASE_DIR-based); update_parameter_in_ldx resolves symlinks itself
+            file_path = get_file_path_from_metadata(files_by_id.get(file_id))
             if file_path:
-                file_path = file_path.resolve()  # Get absolute path
-                print(f"[PARAM_UPDATE] Resolved path for ID '{file_id}': {file_path}")
+                print(f"[PARAM_UPDATE] Path for ID '{file_id}': {file_path}")
             
             if file_path and file_path.exists() and file_path.suffix.lower() == settings.MOTEC_LDX_EXTENSION.lower():
                 print(f"[PARAM_UPDATE] ✓ File exists and is LDX: {file_path.name}")
@@ -568,10 +585,8 @@ async def api_get_history(
     
     if form_id:
         # Get history by form_id
-        from internal.database import get_db
-        db = await get_db()
-        try:
-            db.row_factory = aiosqlite.Row
+        from internal.database import get_reader
+        async with get_reader() as db:
             cursor = await db.execute(
                 "SELECT * FROM parameter_history WHERE form_id = ? ORDER BY updated_at DESC",
                 (form_id,)
@@ -579,26 +594,19 @@ async def api_get_history(
             rows = await cursor.fetchall()
             history = [dict(row) for row in rows]
             return {"history": history}
-        finally:
-            await db.close()
     elif parameter:
         history = await get_parameter_history(parameter)
         return {"history": history}
     else:
         # Get all history
-        from internal.database import get_db
-        import aiosqlite
-        db = await get_db()
-        try:
-            db.row_factory = aiosqlite.Row
+        from internal.database import get_reader
+        async with get_reader() as db:
             cursor = await db.execute(
                 "SELECT * FROM parameter_history ORDER BY updated_at DESC LIMIT 100"
             )
             rows = await cursor.fetchall()
             history = [dict(row) for row in rows]
             return {"history": history}
-        finally:
-            await db.close()
 
 
 @app.get("/api/search")
@@ -859,7 +867,8 @@ async def api_upload_motec_file(
     
     # Save file and get metadata
     try:
-        metadata = save_uploaded_file(content, filename, file_type)
+        # Writing and parsing a multi-MB LD file is blocking IO - keep it off the event loop
+        metadata = await asyncio.to_thread(save_uploaded_file, content, filename, file_type)
         file_id = metadata.get("id", "")
         file_path = get_file_path(file_id)
         
@@ -1019,8 +1028,10 @@ async def api_upload_motec_file(
                             parameters_created += 1
                 
                 elif file_type == "ld":
-                    # Parse LD file metadata (limited parameter extraction)
-                    parsed = MotecParser.parse_file(file_path)
+                    # LD metadata (limited parameter extraction) - reuse the parse from car
+                    # identification; LD files aren't modified by queue injection
+                    if parsed is None:
+                        parsed = MotecParser.parse_file(file_path)
                     
                     # Extract basic metadata as parameters
                     ld_params = []
@@ -1534,13 +1545,15 @@ async def api_reset_website(
             from pathlib import Path
             motec_dir = Path("data/motec_files")
             if motec_dir.exists():
-                import shutil
+                import os
                 for subdir in ["ldx", "ld"]:
                     subdir_path = motec_dir / subdir
                     if subdir_path.exists():
-                        for file in subdir_path.glob("*"):
-                            if file.is_file() and not file.name.endswith('.bak'):
-                                file.unlink()
+                        # scandir entries carry the file type, so no extra stat per file
+                        with os.scandir(subdir_path) as entries:
+                            for entry in entries:
+                                if entry.is_file() and not entry.name.endswith('.bak'):
+                                    os.unlink(entry.path)
                 result["uploaded_files_deleted"] = True
         
         # Clear sessions if requested
@@ -0,0 +1,82 @@
+"""
+Test the database connection pool (shared writer + read-only reader pool)
+"""
+import pytest
+import sqlite3
+
+from internal import database
+from internal.database import get_reader, get_writer, close_db
+
+
+@pytest.fixture
+async def pool_db(tmp_path, monkeypatch):
+    """Point the pool at a fresh database with one table"""
+    await close_db()
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "pool.db")
+    async with get_writer() as db:
+        await db.execute("CREATE TABLE items (name TEXT)")
+        await db.commit()
+    yield
+    await close_db()
+
+
+async def count_items() -> int:
+    """Count rows through a pooled reader"""
+    async with get_reader() as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM items")
+        return (await cursor.fetchone())[0]
+
+
+async def test_writer_rolls_back_on_error(pool_db):
+    """A block that raises must not leave its transaction open on the shared writer"""
+    with pytest.raises(RuntimeError):
+        async with get_writer() as db:
+            await db.execute("INSERT INTO items VALUES ('lost')")
+            assert db.in_transaction
+            raise RuntimeError("boom")
+    
+    assert not database._writer.in_transaction
+    assert await count_items() == 0
+    
+    # The next writer starts clean and its commit only contains its own rows
+    async with get_writer() as db:
+        await db.execute("INSERT INTO items VALUES ('kept')")
+        await db.commit()
+    assert await count_items() == 1
+
+
+async def test_writer_rolls_back_uncommitted_block(pool_db):
+    """Writes a block forgets to commit are rolled back, not handed to the next writer"""
+    async with get_writer() as db:
+        await db.execute("INSERT INTO items VALUES ('uncommitted')")
+    
+    assert not database._writer.in_transaction
+    assert await count_items() == 0
+
+
+async def test_reader_rejects_writes(pool_db):
+    """Pooled readers are query_only"""
+    async with get_reader() as db:
+        with pytest.raises(sqlite3.OperationalError):
+            await db.execute("INSERT INTO items VALUES ('nope')")
+    
+    assert await count_items() == 0
+
+
+async def test_reader_returned_to_pool(pool_db):
+    """Readers go back to the pool on exit, up to READER_POOL_SIZE idle connections"""
+    async with get_reader() as first:
+        pass
+    assert database._idle_readers == [first]
+    
+    async with get_reader() as again:
+        assert again is first
+        assert database._idle_readers == []
+    
+    # Borrow more readers than the pool keeps - the extras are closed, not pooled
+    borrowed = [get_reader() for _ in range(database.READER_POOL_SIZE + 2)]
+    for ctx in borrowed:
+        await ctx.__aenter__()
+    for ctx in borrowed:
+        await ctx.__aexit__(None, None, None)
+    assert len(database._idle_readers) == database.READER_POOL_SIZE
@@ -0,0 +1,184 @@
+"""
+Test the stat-keyed file caches (MoTeC parse results, LDX Ids, file metadata, car parameter definitions)
+"""
+import pytest
+import os
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from internal import motec_parser, motec_ldx_updater, motec_file_manager, car_parameters
+from internal.motec_parser import MotecParser, MotecLdParser
+from internal.motec_ldx_updater import MotecLdxUpdater
+
+
+@pytest.fixture
+def parse_cache(monkeypatch):
+    """Give each test an empty parse cache"""
+    cache = OrderedDict()
+    monkeypatch.setattr(motec_parser, "_parse_cache", cache)
+    return cache
+
+
+def replace_keeping_stat(path, data: bytes):
+    """Atomically replace a file with same-size content and the old mtime - only the inode changes"""
+    old = path.stat()
+    assert len(data) == old.st_size
+    temp_path = path.with_suffix(path.suffix + ".new")
+    temp_path.write_bytes(data)
+    os.utime(temp_path, ns=(old.st_atime_ns, old.st_mtime_ns))
+    os.replace(temp_path, path)
+
+
+def count_calls(monkeypatch, owner, name):
+    """Wrap owner.name so the test can see how many times it ran"""
+    calls = []
+    original = getattr(owner, name)
+    
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+    
+    monkeypatch.setattr(owner, name, wrapper)
+    return calls
+
+
+def write_ld(path, driver="Driver"):
+    """Write a minimal LD file with a readable driver name in its header"""
+    path.write_bytes(b"\x40\x00\x00\x00" + f" {driver} ".encode() + b"\x00" * 64)
+    return path
+
+
+def test_parse_cache_shared_across_threads(tmp_path, parse_cache, monkeypatch):
+    """Uploads parse on worker threads - concurrent hits and evictions must not surface as parse errors"""
+    monkeypatch.setattr(motec_parser, "PARSE_CACHE_SIZE", 4)
+    files = [write_ld(tmp_path / f"run{i}.ld", f"Driver{i}") for i in range(16)]
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(MotecParser.parse_metadata, files * 50))
+    
+    assert all("parse_error" not in r for r in results)
+    assert [r["driver_name"] for r in results[:16]] == [f"Driver{i}" for i in range(16)]
+    assert len(parse_cache) <= 4
+
+
+def test_parse_cache_hit_and_refresh(tmp_path, parse_cache, monkeypatch):
+    """Unchanged files are parsed once; an os.replace rewrite is re-parsed even with the same size and mtime"""
+    parses = count_calls(monkeypatch, MotecLdParser, "parse")
+    ld_file = write_ld(tmp_path / "run.ld", "Alice")
+    
+    assert MotecParser.parse_metadata(ld_file)["driver_name"] == "Alice"
+    assert MotecParser.parse_metadata(ld_file)["driver_name"] == "Alice"
+    assert len(parses) == 1
+    
+    replace_keeping_stat(ld_file, write_ld(tmp_path / "other.ld", "Bobby").read_bytes())
+    assert MotecParser.parse_metadata(ld_file)["driver_name"] == "Bobby"
+    assert len(parses) == 2
+
+
+def test_parse_file_returns_copy(tmp_path, parse_cache):
+    """Mutating a parse_file result doesn't change the cached parse"""
+    ld_file = write_ld(tmp_path / "run.ld", "Alice")
+    
+    MotecParser.parse_file(ld_file)["extracted_strings"].append("junk")
+    assert "junk" not in MotecParser.parse_file(ld_file)["extracted_strings"]
+
+
+LDX_TEMPLATE = """<?xml version="1.0"?>
+<LDXFile Version="1.6"><Layers><Details><String Id="{id}" Value="1"/></Details></Layers></LDXFile>
+"""
+
+
+def test_ldx_ids_cache_hit_and_refresh(tmp_path, monkeypatch):
+    """Id sets are read once per file version; an os.replace rewrite is picked up via the inode"""
+    monkeypatch.setattr(motec_ldx_updater, "_ldx_ids_cache", OrderedDict())
+    reads = count_calls(monkeypatch, motec_ldx_updater.ET, "parse")
+    ldx_file = tmp_path / "setup.ldx"
+    ldx_file.write_text(LDX_TEMPLATE.format(id="Wing Angle"))
+    
+    assert MotecLdxUpdater.ldx_file_contains_parameter(ldx_file, "ldx_details_Wing_Angle")
+    assert not MotecLdxUpdater.ldx_file_contains_parameter(ldx_file, "ldx_details_Ride_Level")
+    assert len(reads) == 1
+    
+    replace_keeping_stat(ldx_file, LDX_TEMPLATE.format(id="Ride Level").encode())
+    assert MotecLdxUpdater.ldx_file_contains_parameter(ldx_file, "ldx_details_Ride_Level")
+    assert not MotecLdxUpdater.ldx_file_contains_parameter(ldx_file, "ldx_details_Wing_Angle")
+    assert len(reads) == 2
+
+
+@pytest.fixture
+def metadata_file(tmp_path, monkeypatch):
+    """Point the MoTeC file manager at an empty metadata file and cache"""
+    path = tmp_path / "motec_files_metadata.json"
+    monkeypatch.setattr(motec_file_manager, "MOTEC_METADATA_FILE", path)
+    monkeypatch.setattr(motec_file_manager, "_metadata_cache", {"key": None, "files": [], "by_id": {}})
+    return path
+
+
+def test_metadata_cache_hit_and_refresh(metadata_file, monkeypatch):
+    """The metadata file is parsed once per version - save_metadata and external replaces both refresh it"""
+    reads = count_calls(monkeypatch, motec_file_manager, "_read_metadata_file")
+    motec_file_manager.save_metadata([{"id": "a", "filename": "a.ld"}])
+    
+    assert [f["id"] for f in motec_file_manager.load_metadata()] == ["a"]
+    assert motec_file_manager.get_file_by_id("a")["filename"] == "a.ld"
+    assert len(reads) == 1
+    
+    motec_file_manager.save_metadata([{"id": "b", "filename": "b.ld"}])
+    assert motec_file_manager.get_file_by_id("a") is None
+    assert motec_file_manager.get_file_by_id("b")["filename"] == "b.ld"
+    assert len(reads) == 2
+    
+    replace_keeping_stat(metadata_file, orjson.dumps([{"id": "c", "filename": "c.ld"}]))
+    assert [f["id"] for f in motec_file_manager.load_metadata()] == ["c"]
+    assert len(reads) == 3
+
+
+def test_metadata_cache_returns_copies(metadata_file):
+    """Callers can mutate what load_metadata/get_file_by_id return without touching the cache"""
+    motec_file_manager.save_metadata([{"id": "a", "filename": "a.ld"}])
+    
+    files = motec_file_manager.load_metadata()
+    files[0]["car_id"] = "car1"
+    files.append({"id": "extra"})
+    motec_file_manager.get_file_by_id("a")["filename"] = "changed.ld"
+    
+    assert motec_file_manager.load_metadata() == [{"id": "a", "filename": "a.ld"}]
+    assert motec_file_manager.get_file_by_id("a") == {"id": "a", "filename": "a.ld"}
+    assert motec_file_manager.get_file_by_id("extra") is None
+
+
+@pytest.fixture
+def definitions_file(tmp_path, monkeypatch):
+    """Point car_parameters at a fresh definitions file and cache"""
+    path = tmp_path / "car_parameters.json"
+    monkeypatch.setattr(car_parameters, "CAR_PARAMETERS_FILE", path)
+    monkeypatch.setattr(car_parameters, "_definitions_cache", {"key": None, "params": [], "by_name": {}, "by_link_key": {}})
+    path.write_bytes(orjson.dumps({"parameters": [{"parameter_name": "wing_a", "link_key": "aero_wing_a"}]}))
+    return path
+
+
+def test_definitions_cache_hit_and_refresh(definitions_file, monkeypatch):
+    """Definitions are parsed once per version - save_car_parameters and external replaces both refresh them"""
+    reads = count_calls(monkeypatch, car_parameters, "load_car_parameters")
+    
+    assert car_parameters.get_car_parameter_definition("wing_a") is not None
+    assert car_parameters.get_car_parameter_definition_by_link_key("aero_wing_a") is not None
+    assert len(car_parameters.get_all_car_parameter_definitions()) == 1
+    assert len(reads) == 1
+    
+    car_parameters.save_car_parameters({"parameters": [{"parameter_name": "wing_b"}]})
+    assert car_parameters.get_car_parameter_definition("wing_a") is None
+    assert car_parameters.get_car_parameter_definition_by_link_key("aero_wing_a") is None
+    assert car_parameters.get_car_parameter_definition("wing_b") is not None
+    assert len(reads) == 2
+    
+    replace_keeping_stat(definitions_file, definitions_file.read_bytes().replace(b"wing_b", b"wing_c"))
+    assert car_parameters.get_car_parameter_definition("wing_c") is not None
+    assert len(reads) == 3
+
+
+def test_definitions_list_is_a_copy(definitions_file):
+    """Changing the list from get_all_car_parameter_definitions doesn't change the cache"""
+    car_parameters.get_all_car_parameter_definitions().clear()
+    assert len(car_parameters.get_all_car_parameter_definitions()) == 1
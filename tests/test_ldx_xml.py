@@ -0,0 +1,104 @@
+"""
+Test LDX parsing and updating on both XML backends (lxml when installed, xml.etree otherwise)
+"""
+import pytest
+import xml.etree.ElementTree as StdET
+from collections import OrderedDict
+
+from internal import motec_parser, motec_ldx_updater
+from internal.motec_parser import MotecLdxParser
+from internal.motec_ldx_updater import MotecLdxUpdater
+
+
+SAMPLE_LDX = """<?xml version="1.0"?>
+<LDXFile Locale="English_United States.1252" DefaultLocale="C" Version="1.6">
+ <Layers>
+  <Layer>
+   <MarkerBlock>
+    <MarkerGroup Name="Laps" Index="0">
+     <Marker Version="100" ClassName="BCU" Name="Lap 1" Flags="77" Time="61.5"/>
+     <Marker Version="100" ClassName="BCU" Name="Lap 2" Flags="77" Time="123.0"/>
+    </MarkerGroup>
+   </MarkerBlock>
+   <RangeBlock/>
+  </Layer>
+  <Details>
+   <String Id="Wing Angle" Value="12"/>
+   <String Id="Driver" Value="Alice"/>
+  </Details>
+ </Layers>
+ <Maths>
+  <MathItems>
+   <MathScaleOffset Id="Ride Height" Scale="1" Offset="0"/>
+  </MathItems>
+ </Maths>
+</LDXFile>
+"""
+
+XXE_LDX = """<?xml version="1.0"?>
+<!DOCTYPE LDXFile [<!ENTITY secret SYSTEM "file://{secret_path}">]>
+<LDXFile Version="1.6"><Layers><Details>
+<String Id="Wing Angle" Value="12"/><String Id="Leak">&secret;</String>
+</Details></Layers></LDXFile>
+"""
+
+
+@pytest.fixture(params=["lxml", "stdlib"])
+def xml_backend(request, monkeypatch):
+    """Run the test once on the backend the modules imported (lxml) and once on the stdlib fallback"""
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+        assert motec_parser.ET.__name__ == "lxml.etree"
+        assert motec_ldx_updater.ET.__name__ == "lxml.etree"
+    else:
+        monkeypatch.setattr(motec_parser, "ET", StdET)
+        monkeypatch.setattr(motec_parser, "ITERPARSE_OPTIONS", {})
+        monkeypatch.setattr(motec_ldx_updater, "ET", StdET)
+        monkeypatch.setattr(motec_ldx_updater, "XML_PARSER", None)
+    monkeypatch.setattr(motec_parser, "_parse_cache", OrderedDict())
+    monkeypatch.setattr(motec_ldx_updater, "_ldx_ids_cache", OrderedDict())
+    return request.param
+
+
+def test_parse_ldx(tmp_path, xml_backend):
+    """Details, marker groups, layers and range blocks come out the same on either backend"""
+    ldx_file = tmp_path / "setup.ldx"
+    ldx_file.write_text(SAMPLE_LDX)
+    
+    result = MotecLdxParser.parse(ldx_file)
+    
+    assert "parse_error" not in result
+    assert result["version"] == "1.6"
+    assert result["default_locale"] == "C"
+    assert result["details"] == {"Wing Angle": "12", "Driver": "Alice"}
+    assert result["total_markers"] == 2
+    assert [m["name"] for m in result["marker_groups"][0]["markers"]] == ["Lap 1", "Lap 2"]
+    assert result["layer_count"] == 1
+    assert result["has_range_block"] is True
+
+
+def test_update_ldx_round_trip(tmp_path, xml_backend):
+    """Updates written by either backend parse back with the new values"""
+    ldx_file = tmp_path / "setup.ldx"
+    ldx_file.write_text(SAMPLE_LDX)
+    
+    assert MotecLdxUpdater.update_parameter_in_ldx(ldx_file, "ldx_details_Wing_Angle", "15")
+    assert MotecLdxUpdater.update_parameter_in_ldx(ldx_file, "ldx_math_Ride_Height_scale", "2.5")
+    
+    assert MotecLdxParser.parse(ldx_file)["details"]["Wing Angle"] == "15"
+    math_item = StdET.parse(ldx_file).getroot().find(".//MathScaleOffset")
+    assert math_item.get("Scale") == "2.5"
+    assert MotecLdxUpdater.ldx_file_contains_parameter(ldx_file, "ldx_details_Wing_Angle")
+
+
+def test_external_entities_not_expanded(tmp_path, xml_backend):
+    """A crafted DOCTYPE can't pull local files into parsed details or rewritten LDX files"""
+    secret_path = tmp_path / "secret.txt"
+    secret_path.write_text("TOPSECRET")
+    ldx_file = tmp_path / "setup.ldx"
+    ldx_file.write_text(XXE_LDX.format(secret_path=secret_path))
+    
+    assert "TOPSECRET" not in repr(MotecLdxParser.parse(ldx_file))
+    
+    MotecLdxUpdater.update_parameter_in_ldx(ldx_file, "ldx_details_Wing_Angle", "15")
+    assert b"TOPSECRET" not in ldx_file.read_bytes()